@@ -20,6 +20,10 @@ from app.db.base import Base
 # Import models here to ensure they are registered with Base.metadata for autogenerate support
 from app.models.user import User  # noqa: F401
 from app.models.meal import Meal  # noqa: F401
+from app.models.daily_total import DailyTotal  # noqa: F401
+from app.models.idempotency_key import IdempotencyKey  # noqa: F401
+from app.models.meal_tombstone import MealTombstone  # noqa: F401
+from app.models.stored_image import StoredImage  # noqa: F401
 # ----------------------
 
 # Alembic Config object, providing access to the values within the .ini file
@@ -10,8 +10,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core import security
 from app.core.config import settings
-from app.db.session import SessionLocal
+from app.db.session import SessionLocal, ReadSessionLocal
 from app.models.user import User
+from app.services.user_cache import get_cached_user, cache_user
 
 # This tells FastAPI that the token creates a "lock" on endpoints
 # The tokenUrl points to where the user sends their password to get a token
@@ -24,11 +25,15 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with SessionLocal() as session:
         yield session
 
-async def get_current_user(
-    db: AsyncSession = Depends(get_db),
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    # read-only session, served by the replica when one is configured
+    async with ReadSessionLocal() as session:
+        yield session
+
+async def get_current_user_id(
     token: str = Depends(reusable_oauth2)
-) -> User:
-    # 1. Decode the token
+) -> int:
+    """Only validates the token. For endpoints that need nothing but the id (no db access)."""
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
@@ -39,12 +44,24 @@ async def get_current_user(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
-    
-    # 2. Check if user exists in DB
     # (user_id is stored as string in token, so we cast to int if needed)
-    user = await db.get(User, int(token_data))
+    return int(token_data)
+
+async def get_current_user(
+    db: AsyncSession = Depends(get_db),
+    user_id: int = Depends(get_current_user_id)
+) -> User:
+    # 1. Recently seen users come from the cache, attached to this request's session
+    user = await get_cached_user(user_id)
+    if user is not None:
+        db.add(user)
+        return user
+
+    # 2. Check if user exists in DB
+    user = await db.get(User, user_id)
     
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    return user
\ No newline at end of file
+    await cache_user(user)
+    return user
@@ -1,25 +1,58 @@
+import json
+
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from app.services.openai_service import chat_with_nutritionist
+from app.services.chat_service import get_chat_reply, stream_chat_reply
+from app.services.resilience import AIServiceError
 
 router = APIRouter()
 
 class ChatRequest(BaseModel):
     message: str
+    # stream the reply as server-sent events instead of waiting for all of it
+    stream: bool = False
+    # set to false to skip the reply cache and always ask the model
+    use_cache: bool = True
+
+async def _sse_events(message: str, use_cache: bool):
+    # first bytes go out before the model starts answering
+    yield ": stream-open\n\n"
+    try:
+        async for event in stream_chat_reply(message, use_cache):
+            event_type = event.pop("type")
+            yield f"event: {event_type}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+    except AIServiceError as e:
+        # the 200 is already sent, the client gets the 503 as an error event
+        print(f"ai unavailable: {e}")
+        data = {"message": f"ai service unavailable: {e}", "status_code": 503}
+        yield f"event: error\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
 
 @router.post("/")
 async def chat_endpoint(req: ChatRequest):
     if not req.message.strip():
         raise HTTPException(status_code=400, detail="Message empty")
-    
+
     print(f"DEBUG: User sent: '{req.message}'")
-    
-    reply = await chat_with_nutritionist(req.message)
-    
+
+    if req.stream:
+        return StreamingResponse(
+            _sse_events(req.message, req.use_cache),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    try:
+        reply, cached = await get_chat_reply(req.message, req.use_cache)
+    except AIServiceError as e:
+        # upstream is down or failing (or the circuit is open), the client may retry later
+        print(f"ai unavailable: {e}")
+        raise HTTPException(status_code=503, detail=f"ai service unavailable: {str(e)}")
+
     print(f"DEBUG: AI RAW RESPONSE: '{reply}'")
-    
+
     if reply is None or str(reply).strip() == "":
         print("DEBUG: Reply was empty! Sending fallback message.")
         reply = "Вибач, я не зміг згенерувати відповідь. Спробуй перефразувати."
 
-    return {"reply": reply}
\ No newline at end of file
+    return {"reply": reply, "cached": cached}
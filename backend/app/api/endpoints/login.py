@@ -18,6 +18,7 @@ from app.models.user import User
 from app.schemas.token import Token
 from app.schemas.user import NewPassword  # <--- Імпортували схему для пароля
 from app.schemas.msg import Msg           # <--- Імпортували схему повідомлення
+from app.services.user_cache import invalidate_user
 
 router = APIRouter()
 
@@ -34,12 +35,24 @@ async def login_access_token(
     user = result.scalars().first()
 
     # 2. Check password
-    if not user or not security.verify_password(form_data.password, user.hashed_password):
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Incorrect email or password",
+        )
+    valid, new_hash = await security.verify_and_update_password(form_data.password, user.hashed_password)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Incorrect email or password",
         )
 
+    # the bcrypt cost changed since this hash was made, upgrade it now that we know the password
+    if new_hash:
+        user.hashed_password = new_hash
+        db.add(user)
+        await db.commit()
+
     # 3. Create BOTH tokens
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     refresh_token_expires = timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
@@ -158,8 +171,9 @@ async def reset_password(
         raise HTTPException(status_code=404, detail="User not found")
         
     # Set new password
-    user.hashed_password = security.get_password_hash(body.new_password)
+    user.hashed_password = await security.get_password_hash(body.new_password)
     db.add(user)
     await db.commit()
+    await invalidate_user(user.id)
     
     return {"msg": "Password updated successfully"}
\ No newline at end of file
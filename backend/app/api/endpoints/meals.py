@@ -1,71 +1,109 @@
 # backend/app/api/endpoints/meals.py
-import shutil
-import os
-import uuid
+import asyncio
+import base64
+import hashlib
 import math
-from datetime import date, datetime, timedelta
-from typing import List, Any, Optional
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Any, Literal, Optional, Tuple
 
 from fastapi import APIRouter, Depends, HTTPException, Body, UploadFile, File, status, Query, Request
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import func
+from sqlalchemy import func, tuple_
 
 # rate limiting imports
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
 from app.api import deps
+from app.core.config import settings
+from app.core.timezones import day_range, get_zone, local_today
 from app.models.meal import Meal
+from app.models.daily_total import DailyTotal
 from app.models.user import User
 from app.schemas.meal import (
     MealCreate, 
     Meal as MealSchema, 
     MealUpdate, 
     MealPagination, 
-    FoodAnalysisResponse
+    MealCursorPage,
+    MealImportResult,
+    MealBatchRequest,
+    MealBatchResponse,
+    MealChanges,
+    FoodAnalysisResponse,
+    BatchAnalysisResponse,
+    AnalysisJobCreated,
+    AnalysisJob,
+    RangeStats
 )
-from app.services.openai_service import analyze_food_image
+from app.services.analysis_service import analyze_image_cached
+from app.services.rollup_service import add_meal_to_totals, remove_meal_from_totals
+from app.services.stats_service import range_stats
+from app.services.analysis_jobs import submit_job, get_job, STATUS_QUEUED, FINAL_STATUSES
+from app.services.resilience import AIServiceError
+from app.services.upload_service import save_upload, UploadRejected
+from app.services.import_service import import_meals, detect_format, ImportRejected
+from app.services.export_service import stream_meal_export
+from app.services.meal_batch_service import apply_meal_batch
+from app.services.sync_service import bump_version, current_version, get_changes, record_tombstones
+from app.services.storage_service import adjust_refs, count_refs, normalize_image_url, public_image_url
 
 router = APIRouter()
 
 # setup limiter
 limiter = Limiter(key_func=get_remote_address)
 
-UPLOAD_DIR = "app/static/uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
-
-# helper to build absolute url
+# helper to build absolute url (stored images resolve through the storage)
 def get_absolute_url(request: Request, relative_path: str) -> str:
-    if not relative_path:
-        return None
-    base_url = str(request.base_url).rstrip("/")
-    if relative_path.startswith("/"):
-        return f"{base_url}{relative_path}"
-    return f"{base_url}/{relative_path}"
+    return public_image_url(relative_path, str(request.base_url))
+
+# half-open range on the raw column, so the (user_id, created_at) index is usable
+def _on_day(column, day: date, user: User) -> tuple:
+    start, end = day_range(day, day, get_zone(user.timezone))
+    return column >= start, column < end
+
+# --- Conditional GET (ETag from the user's sync version) ---
+async def _check_etag(
+    request: Request, response: Response, db: AsyncSession, user: User, *parts
+) -> Optional[Response]:
+    """
+    Sets the ETag (sync version, timezone + everything else the response depends on).
+    Returns a 304 response when the client already has it, before any real query runs.
+    """
+    version = await current_version(db, user.id)
+    raw = "|".join(str(part) for part in (version, user.timezone, request.url.path, *parts))
+    etag = f'W/"{hashlib.sha1(raw.encode()).hexdigest()[:20]}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
 
 # --- Feature #14: Daily Summary ---
 @router.get("/summary")
 async def get_daily_summary(
-    date_query: date = Query(default_factory=date.today),
-    db: AsyncSession = Depends(deps.get_db),
+    request: Request,
+    response: Response,
+    date_query: Optional[date] = None,
+    db: AsyncSession = Depends(deps.get_read_db),
     current_user: User = Depends(deps.get_current_user)
 ):
     """Returns calculated totals for a specific date (Progress Ring)."""
-    result = await db.execute(
-        select(Meal)
-        .where(
-            Meal.user_id == current_user.id,
-            func.date(Meal.created_at) == date_query
-        )
-    )
-    meals = result.scalars().all()
-
-    total_calories = sum(m.calories for m in meals)
-    total_protein = sum(m.protein for m in meals)
-    total_fats = sum(m.fats for m in meals)
-    total_carbs = sum(m.carbs for m in meals)
+    # "today" is the user's today, not the server's
+    if date_query is None:
+        date_query = local_today(get_zone(current_user.timezone))
+    not_modified = await _check_etag(request, response, db, current_user, date_query, current_user.calories_goal)
+    if not_modified:
+        return not_modified
+    # single primary-key lookup in the daily rollup
+    totals = await db.get(DailyTotal, (current_user.id, date_query))
 
+    total_calories = totals.calories if totals else 0
     goal = current_user.calories_goal or 2000
     remaining = goal - total_calories
 
@@ -74,101 +112,249 @@ async def get_daily_summary(
         "total_calories": total_calories,
         "goal_calories": goal,
         "remaining_calories": remaining,
-        "total_protein": round(total_protein, 1),
-        "total_fats": round(total_fats, 1),
-        "total_carbs": round(total_carbs, 1),
-        "meal_count": len(meals)
+        "total_protein": round(totals.protein, 1) if totals else 0.0,
+        "total_fats": round(totals.fats, 1) if totals else 0.0,
+        "total_carbs": round(totals.carbs, 1) if totals else 0.0,
+        "meal_count": totals.meal_count if totals else 0
     }
 
 # --- Feature #15: Weekly Statistics (Graph) ---
 @router.get("/weekly-stats")
 async def get_weekly_stats(
-    db: AsyncSession = Depends(deps.get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(deps.get_read_db),
     current_user: User = Depends(deps.get_current_user)
 ):
-    today = date.today()
+    today = local_today(get_zone(current_user.timezone))
     start_date = today - timedelta(days=6)
+    not_modified = await _check_etag(request, response, db, current_user, today)
+    if not_modified:
+        return not_modified
 
-    result = await db.execute(
-        select(Meal)
-        .where(
-            Meal.user_id == current_user.id,
-            func.date(Meal.created_at) >= start_date
-        )
-    )
-    meals = result.scalars().all()
-
-    stats = { (start_date + timedelta(days=i)): 0 for i in range(7) }
-
-    for meal in meals:
-        meal_date = meal.created_at.date()
-        if meal_date in stats:
-            stats[meal_date] += meal.calories
-
-    response_data = [
-        {"date": day, "total_calories": cal} 
-        for day, cal in stats.items()
+    # days without meals come back as 0 from the db
+    buckets = await range_stats(db, current_user.id, start_date, today, "day")
+    return [
+        {"date": item["date"], "total_calories": item["total_calories"]}
+        for item in buckets
     ]
-    response_data.sort(key=lambda x: x["date"])
-    
-    return response_data
 
-# --- Feature #17: AI Analysis with Rate Limiting ---
-@router.post("/analyze", response_model=FoodAnalysisResponse)
-@limiter.limit("5/minute")
-async def analyze_meal(
+# --- Range Statistics (30/90/365-day charts) ---
+@router.get("/stats", response_model=RangeStats)
+async def get_range_stats(
     request: Request,
-    file: UploadFile = File(...),
+    response: Response,
+    days: int = Query(30, ge=1, le=366),
+    bucket: Literal["day", "week", "month"] = "day",
+    end_date: Optional[date] = None,
+    db: AsyncSession = Depends(deps.get_read_db),
     current_user: User = Depends(deps.get_current_user)
 ):
-    file_extension = file.filename.split(".")[-1]
-    filename = f"{uuid.uuid4()}.{file_extension}"
-    file_path = os.path.join(UPLOAD_DIR, filename)
-    
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-    
-    relative_path = f"/static/uploads/{filename}"
-    absolute_url = get_absolute_url(request, relative_path)
+    """Calories and macros for the last `days` days ending at end_date, one item per bucket."""
+    if end_date is None:
+        end_date = local_today(get_zone(current_user.timezone))
+    start_date = end_date - timedelta(days=days - 1)
+    not_modified = await _check_etag(request, response, db, current_user, start_date, end_date, bucket)
+    if not_modified:
+        return not_modified
+    items = await range_stats(db, current_user.id, start_date, end_date, bucket)
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        "bucket": bucket,
+        "items": items
+    }
 
+# --- Feature #17: AI Analysis with Rate Limiting ---
+async def _analyze_upload(request: Request, file: UploadFile) -> dict:
+    """Stores one uploaded photo and runs the (cached) ai analysis on it."""
+    # stream the upload to disk (off the event loop, size-limited, hashed)
     try:
-        # calling ai service
+        upload = await save_upload(file)
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    absolute_url = get_absolute_url(request, upload.relative_url)
+
+    # no cleanup on failure: the image may be shared with other uploads,
+    # unreferenced ones are removed by the storage sweep
+    try:
+        # calling ai service (answered from cache for repeated uploads)
         # if this fails, we catch it below
-        analysis_result = await analyze_food_image(file_path)
+        analysis_result = await analyze_image_cached(upload.path, upload.sha256)
         
         if not analysis_result:
              raise ValueError("ai returned empty result")
 
         # check food flag
-        is_food = analysis_result.get("is_food", True)
-        if is_food is False:
-            if os.path.exists(file_path):
-                os.remove(file_path)
+        if analysis_result["is_food"] is False:
             raise HTTPException(
                 status_code=400, 
                 detail="ai did not detect food"
             )
 
-        return {
-            "name": analysis_result.get("name", "Unknown Food"),
-            "calories": analysis_result.get("calories", 0),
-            "protein": analysis_result.get("protein", 0),
-            "fats": analysis_result.get("fats", 0),
-            "carbs": analysis_result.get("carbs", 0),
-            "weight_grams": analysis_result.get("weight_grams", 0),
-            "is_food": True,
-            "image_url": absolute_url,
-            "confidence": 1.0
-        }
+        return {**analysis_result, "image_url": absolute_url}
 
+    except HTTPException:
+        raise
+    except AIServiceError as e:
+        # upstream is down or failing, the client may retry later
+        print(f"ai unavailable: {e}")
+        raise HTTPException(status_code=503, detail=f"ai service unavailable: {str(e)}")
     except Exception as e:
         # here we return the REAL error from openai
-        if os.path.exists(file_path):
-            os.remove(file_path)
         print(f"ai error: {e}")
         raise HTTPException(status_code=500, detail=f"ai analysis failed: {str(e)}")
 
 
+@router.post("/analyze", response_model=FoodAnalysisResponse)
+@limiter.limit(settings.ANALYZE_RATE_LIMIT)
+async def analyze_meal(
+    request: Request,
+    file: UploadFile = File(...),
+    user_id: int = Depends(deps.get_current_user_id)
+):
+    return await _analyze_upload(request, file)
+
+
+@router.post("/analyze/batch", response_model=BatchAnalysisResponse)
+@limiter.limit(settings.ANALYZE_RATE_LIMIT)
+async def analyze_meal_batch(
+    request: Request,
+    files: List[UploadFile] = File(...),
+    user_id: int = Depends(deps.get_current_user_id)
+):
+    """
+    Analyzes several photos of one meal concurrently.
+    Each image gets its own result, failures don't affect the others.
+    """
+    if len(files) > settings.ANALYSIS_BATCH_MAX_FILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"too many images (max {settings.ANALYSIS_BATCH_MAX_FILES})"
+        )
+
+    # bounded fan-out so one batch can't flood the ai client
+    semaphore = asyncio.Semaphore(settings.ANALYSIS_BATCH_CONCURRENCY)
+
+    async def run_one(index: int, file: UploadFile) -> dict:
+        async with semaphore:
+            try:
+                result = await _analyze_upload(request, file)
+                return {"index": index, "filename": file.filename, "ok": True, "result": result}
+            except HTTPException as e:
+                return {
+                    "index": index,
+                    "filename": file.filename,
+                    "ok": False,
+                    "status_code": e.status_code,
+                    "error": str(e.detail),
+                }
+
+    results = await asyncio.gather(*(run_one(i, f) for i, f in enumerate(files)))
+
+    return {
+        "results": results,
+        "succeeded": sum(1 for r in results if r["ok"]),
+        "failed": sum(1 for r in results if not r["ok"]),
+    }
+
+
+# --- Background analysis jobs: submit now, poll or stream the result ---
+def _job_response(request: Request, job: dict) -> dict:
+    result = job["result"]
+    if result:
+        result = {**result, "image_url": get_absolute_url(request, result["image_url"])}
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "result": result,
+        "status_code": job["status_code"],
+        "error": job["error"],
+        "created_at": datetime.fromtimestamp(job["created_at"], tz=timezone.utc),
+        "updated_at": datetime.fromtimestamp(job["updated_at"], tz=timezone.utc),
+    }
+
+async def _get_own_job(job_id: str, user_id: int) -> dict:
+    job = await get_job(job_id)
+    if not job or job["user_id"] != user_id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.post("/analyze/jobs", response_model=AnalysisJobCreated, status_code=status.HTTP_202_ACCEPTED)
+@limiter.limit(settings.ANALYZE_RATE_LIMIT)
+async def submit_analysis_job(
+    request: Request,
+    file: UploadFile = File(...),
+    user_id: int = Depends(deps.get_current_user_id)
+):
+    """Stores the photo and queues the analysis. Returns immediately with a job id."""
+    try:
+        upload = await save_upload(file)
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    job_id = await submit_job(user_id, upload)
+    return {"job_id": job_id, "status": STATUS_QUEUED}
+
+
+@router.get("/analyze/jobs/{job_id}", response_model=AnalysisJob)
+async def read_analysis_job(
+    request: Request,
+    job_id: str,
+    user_id: int = Depends(deps.get_current_user_id)
+):
+    """Polling endpoint for a queued analysis."""
+    job = await _get_own_job(job_id, user_id)
+    return _job_response(request, job)
+
+
+@router.get("/analyze/jobs/{job_id}/events")
+async def stream_analysis_job(
+    request: Request,
+    job_id: str,
+    user_id: int = Depends(deps.get_current_user_id)
+):
+    """Server-sent events: one event per status change, closes when the job is finished."""
+    job = await _get_own_job(job_id, user_id)
+
+    async def event_stream():
+        current = job
+        last_status = None
+        started = time.monotonic()
+        last_sent = started
+
+        while current is not None:
+            if current["status"] != last_status:
+                payload = AnalysisJob(**_job_response(request, current)).model_dump_json()
+                yield f"event: {current['status']}\ndata: {payload}\n\n"
+                last_status = current["status"]
+                last_sent = time.monotonic()
+
+            if current["status"] in FINAL_STATUSES:
+                return
+            if time.monotonic() - started > settings.JOB_EVENTS_TIMEOUT_SECONDS:
+                yield "event: timeout\ndata: {}\n\n"
+                return
+            if await request.is_disconnected():
+                return
+
+            # comment line keeps proxies from closing an idle stream
+            if time.monotonic() - last_sent > 15:
+                yield ": keep-alive\n\n"
+                last_sent = time.monotonic()
+
+            await asyncio.sleep(settings.JOB_EVENTS_POLL_SECONDS)
+            current = await get_job(job_id)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.post("/", response_model=MealSchema)
 async def create_meal(
     request: Request,
@@ -176,35 +362,127 @@ async def create_meal(
     db: AsyncSession = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user)
 ):
-    db_meal = Meal(**meal.model_dump(), user_id=current_user.id)
+    version, zone = await bump_version(db, current_user.id)
+    db_meal = Meal(**meal.model_dump(), user_id=current_user.id, version=version)
+    # our own image urls are stored in canonical form and count as a reference
+    db_meal.image_url = normalize_image_url(db_meal.image_url)
+    await adjust_refs(db, count_refs([db_meal.image_url]))
     db.add(db_meal)
-    await db.commit()
+    # flush + refresh to get created_at, then update the rollup in the same transaction
+    await db.flush()
     await db.refresh(db_meal)
+    await add_meal_to_totals(db, db_meal, zone)
+    await db.commit()
     
     if db_meal.image_url:
         db_meal.image_url = get_absolute_url(request, db_meal.image_url)
         
     return db_meal
 
+# --- Bulk Import (history from other trackers) ---
+@router.post("/import", response_model=MealImportResult)
+async def import_meals_file(
+    file: UploadFile = File(...),
+    format: Optional[Literal["csv", "ndjson"]] = None,
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user)
+):
+    """
+    CSV (with a header row) or NDJSON, one meal per row: name, calories, protein, fats,
+    carbs, weight_grams, image_url, created_at. Invalid rows are skipped and reported.
+    """
+    try:
+        fmt = detect_format(file, format)
+        result = await import_meals(db, current_user.id, file, fmt)
+    except ImportRejected as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+
+    await db.commit()
+    return result
+
+# --- Streaming Export (full history) ---
+@router.get("/export")
+async def export_meals(
+    format: Literal["csv", "ndjson"] = "csv",
+    current_user: User = Depends(deps.get_current_user)
+):
+    """Whole meal history, oldest first, in the same columns /import accepts."""
+    zone = get_zone(current_user.timezone)
+    filename = f"meals-{local_today(zone).isoformat()}.{format}"
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        stream_meal_export(current_user.id, zone, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+# --- Batched Mutations (offline sync) ---
+@router.post("/batch", response_model=MealBatchResponse)
+async def apply_meal_operations(
+    request: Request,
+    batch: MealBatchRequest,
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user)
+):
+    """
+    Creates, updates and deletes many meals in one transaction.
+    Each operation has an idempotency key: sending the same key again returns the
+    first result ('replayed') instead of applying it twice, so a queue can be safely re-sent.
+    """
+    if len(batch.operations) > settings.MEAL_BATCH_MAX_OPERATIONS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many operations, the limit is {settings.MEAL_BATCH_MAX_OPERATIONS} per request"
+        )
+    if not batch.operations:
+        return {"results": [], "applied": 0, "replayed": 0, "failed": 0}
+
+    results = await apply_meal_batch(db, current_user.id, batch.operations)
+    await db.commit()
+
+    for item in results:
+        if item["meal"] and item["meal"]["image_url"]:
+            item["meal"]["image_url"] = get_absolute_url(request, item["meal"]["image_url"])
+
+    return {
+        "results": results,
+        "applied": sum(1 for item in results if item["status"] == "applied"),
+        "replayed": sum(1 for item in results if item["status"] == "replayed"),
+        "failed": sum(1 for item in results if item["status"] == "failed")
+    }
+
 # --- UPDATED: Pagination Support ---
 @router.get("/", response_model=MealPagination)
 async def read_meals(
     request: Request,
+    response: Response,
     page: int = 1,
     size: int = 20,
     filter_date: Optional[date] = None, 
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_read_db),
     current_user: User = Depends(deps.get_current_user)
 ):
+    # image urls are absolute, so the host is part of the response too
+    not_modified = await _check_etag(
+        request, response, db, current_user,
+        page, size, filter_date, current_user.timezone, request.base_url
+    )
+    if not_modified:
+        return not_modified
+
     skip = (page - 1) * size
     
     query = select(Meal).where(Meal.user_id == current_user.id)
     if filter_date:
-        query = query.where(func.date(Meal.created_at) == filter_date)
+        query = query.where(*_on_day(Meal.created_at, filter_date, current_user))
     
-    count_query = select(func.count()).select_from(query.subquery())
-    total_result = await db.execute(count_query)
-    total_items = total_result.scalar_one()
+    if filter_date:
+        # a single day, cheap to count directly
+        count_query = select(func.count()).select_from(query.subquery())
+        total_items = (await db.execute(count_query)).scalar_one()
+    else:
+        total_items = await _count_meals(db, current_user.id)
 
     query = query.order_by(Meal.created_at.desc()).offset(skip).limit(size)
     result = await db.execute(query)
@@ -224,6 +502,124 @@ async def read_meals(
         "pages": total_pages
     }
 
+# --- Meal History (keyset pagination) ---
+def _encode_cursor(meal: Meal) -> str:
+    """Opaque cursor pointing at the last meal of a page."""
+    raw = f"{meal.created_at.isoformat()}|{meal.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, meal_id = raw.split("|")
+        return datetime.fromisoformat(created_at), int(meal_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+async def _count_meals(db: AsyncSession, user_id: int) -> int:
+    """Total meals of a user from the daily rollup (one row per day instead of per meal)."""
+    result = await db.execute(
+        select(func.coalesce(func.sum(DailyTotal.meal_count), 0))
+        .where(DailyTotal.user_id == user_id)
+    )
+    return int(result.scalar_one())
+
+@router.get("/history", response_model=MealCursorPage)
+async def read_meal_history(
+    request: Request,
+    cursor: Optional[str] = None,
+    size: int = Query(20, ge=1, le=100),
+    filter_date: Optional[date] = None,
+    include_total: bool = False,
+    db: AsyncSession = Depends(deps.get_read_db),
+    current_user: User = Depends(deps.get_current_user)
+):
+    """Newest first. Pass next_cursor back to get the following page, every page costs the same."""
+    query = select(Meal).where(Meal.user_id == current_user.id)
+    if filter_date:
+        query = query.where(*_on_day(Meal.created_at, filter_date, current_user))
+    if cursor:
+        # continue right after the last meal of the previous page
+        created_at, meal_id = _decode_cursor(cursor)
+        query = query.where(tuple_(Meal.created_at, Meal.id) < tuple_(created_at, meal_id))
+
+    # one extra row tells us whether there is a next page
+    query = query.order_by(Meal.created_at.desc(), Meal.id.desc()).limit(size + 1)
+    result = await db.execute(query)
+    meals = result.scalars().all()
+
+    has_more = len(meals) > size
+    meals = meals[:size]
+    next_cursor = _encode_cursor(meals[-1]) if has_more else None
+
+    for m in meals:
+        if m.image_url:
+            m.image_url = get_absolute_url(request, m.image_url)
+
+    total = None
+    if include_total:
+        if filter_date:
+            count_query = select(func.count()).select_from(
+                select(Meal.id).where(
+                    Meal.user_id == current_user.id,
+                    *_on_day(Meal.created_at, filter_date, current_user)
+                ).subquery()
+            )
+            total = (await db.execute(count_query)).scalar_one()
+        else:
+            total = await _count_meals(db, current_user.id)
+
+    return {
+        "items": meals,
+        "next_cursor": next_cursor,
+        "size": size,
+        "total": total
+    }
+
+# --- Delta Sync ---
+# the cursor also carries the sync version of the first page, every page returns that one
+def _encode_sync_cursor(meal: Meal, pinned_version: int) -> str:
+    raw = f"{meal.version}|{meal.id}|{pinned_version}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def _decode_sync_cursor(cursor: str) -> Tuple[Tuple[int, int], int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        version, meal_id, pinned_version = raw.split("|")
+        return (int(version), int(meal_id)), int(pinned_version)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@router.get("/changes", response_model=MealChanges)
+async def read_meal_changes(
+    request: Request,
+    since: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=1000),
+    db: AsyncSession = Depends(deps.get_db),
+    user_id: int = Depends(deps.get_current_user_id)
+):
+    """
+    Everything that changed after version `since` (0 = full sync).
+    Follow next_cursor until it is None, then keep `version` for the next sync.
+    """
+    after, pinned_version = _decode_sync_cursor(cursor) if cursor else (None, None)
+    version, meals, deleted_ids, has_more = await get_changes(
+        db, user_id, since, after, limit, pinned_version
+    )
+    next_cursor = _encode_sync_cursor(meals[-1], version) if has_more else None
+
+    for m in meals:
+        if m.image_url:
+            m.image_url = get_absolute_url(request, m.image_url)
+
+    return {
+        "version": version,
+        "meals": meals,
+        "deleted_ids": deleted_ids,
+        "next_cursor": next_cursor
+    }
+
 @router.put("/{meal_id}", response_model=MealSchema)
 async def update_meal(
     request: Request,
@@ -232,15 +628,28 @@ async def update_meal(
     db: AsyncSession = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user)
 ):
-    result = await db.execute(select(Meal).where(Meal.id == meal_id, Meal.user_id == current_user.id))
+    version, zone = await bump_version(db, current_user.id)
+    # row lock: concurrent writes of the same meal must not both take the old values out of the rollup
+    result = await db.execute(
+        select(Meal).where(Meal.id == meal_id, Meal.user_id == current_user.id).with_for_update()
+    )
     meal = result.scalars().first()
     
     if not meal:
         raise HTTPException(status_code=404, detail="Meal not found")
         
     update_data = meal_in.model_dump(exclude_unset=True)
+    if "image_url" in update_data:
+        update_data["image_url"] = normalize_image_url(update_data["image_url"])
+        refs = count_refs([update_data["image_url"]])
+        refs.update(count_refs([meal.image_url], -1))
+        await adjust_refs(db, refs)
+    # rollup: take the old values out, put the new ones in
+    await remove_meal_from_totals(db, meal, zone)
     for field, value in update_data.items():
         setattr(meal, field, value)
+    meal.version = version
+    await add_meal_to_totals(db, meal, zone)
         
     db.add(meal)
     await db.commit()
@@ -257,12 +666,20 @@ async def delete_meal(
     db: AsyncSession = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user)
 ):
-    result = await db.execute(select(Meal).where(Meal.id == meal_id, Meal.user_id == current_user.id))
+    version, zone = await bump_version(db, current_user.id)
+    # row lock: concurrent writes of the same meal must not both take the old values out of the rollup
+    result = await db.execute(
+        select(Meal).where(Meal.id == meal_id, Meal.user_id == current_user.id).with_for_update()
+    )
     meal = result.scalars().first()
     
     if not meal:
         raise HTTPException(status_code=404, detail="Meal not found")
         
+    await remove_meal_from_totals(db, meal, zone)
+    await adjust_refs(db, count_refs([meal.image_url], -1))
+    # tombstone, so synced clients learn about the delete
+    await record_tombstones(db, current_user.id, [meal.id], version)
     await db.delete(meal)
     await db.commit()
     return {"ok": True}
\ No newline at end of file
@@ -12,6 +12,10 @@ from app.models.user import User
 # Додали UserUpdate в імпорт (його ми створимо на наступному кроці)
 from app.schemas.user import UserCreate, User as UserSchema, UserUpdatePassword, UserUpdate
 from app.schemas.msg import Msg
+from app.services.rollup_service import rebuild_daily_totals
+from app.services.sync_service import bump_version
+from app.services.user_cache import invalidate_user
+from app.services.storage_service import release_user_images
 
 router = APIRouter()
 
@@ -65,7 +69,7 @@ async def create_user(
     if result.scalars().first():
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    hashed_password = security.get_password_hash(user_in.password)
+    hashed_password = await security.get_password_hash(user_in.password)
 
     new_user = User(
         email=user_in.email, 
@@ -95,6 +99,12 @@ async def update_user_me(
     Automatically recalculates daily calorie goal.
     """
     update_data = user_in.model_dump(exclude_unset=True)
+    if update_data.get("timezone", "") is None:
+        update_data.pop("timezone")  # not nullable, null means "leave as is"
+    if "timezone" in update_data:
+        # compare with the stored zone, the cached user may be behind
+        await db.refresh(current_user, ["timezone"])
+    timezone_changed = "timezone" in update_data and update_data["timezone"] != current_user.timezone
 
     # 1. Update fields
     for field, value in update_data.items():
@@ -106,7 +116,13 @@ async def update_user_me(
         current_user.calories_goal = new_goal
 
     db.add(current_user)
+    # 3. Daily totals are bucketed by local day, recount them in the new zone
+    # and bump the sync version, so summary/stats etags change with the buckets
+    if timezone_changed:
+        await rebuild_daily_totals(db, current_user.id)
+        await bump_version(db, current_user.id)
     await db.commit()
+    await invalidate_user(current_user.id)
     await db.refresh(current_user)
     return current_user
 
@@ -116,8 +132,11 @@ async def delete_user_me(
     current_user: User = Depends(deps.get_current_user),
 ) -> Any:
     """Delete own account."""
+    # the meals go with the cascade, their images lose a reference each
+    await release_user_images(db, current_user.id)
     await db.delete(current_user)
     await db.commit()
+    await invalidate_user(current_user.id)
     return current_user
 
 @router.post("/me/password", response_model=Msg)
@@ -127,10 +146,13 @@ async def update_password_me(
     current_user: User = Depends(deps.get_current_user),
 ) -> Any:
     """Update own password."""
-    if not security.verify_password(body.current_password, current_user.hashed_password):
+    # the hash is never cached, load it
+    await db.refresh(current_user, ["hashed_password"])
+    if not await security.verify_password(body.current_password, current_user.hashed_password):
         raise HTTPException(status_code=400, detail="Incorrect password")
 
-    current_user.hashed_password = security.get_password_hash(body.new_password)
+    current_user.hashed_password = await security.get_password_hash(body.new_password)
     db.add(current_user)
     await db.commit()
+    await invalidate_user(current_user.id)
     return {"msg": "Password updated successfully"}
\ No newline at end of file
@@ -0,0 +1,230 @@
+# backend/app/core/cache.py
+# small key/value caches with size limit, ttl and lru eviction
+# backends are pluggable: in-process memory or a persistent sqlite file
+
+import asyncio
+import json
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from app.core.config import settings
+
+
+class CacheBackend:
+    """
+    Base interface for all caches. Values must be JSON-serializable
+    so that every backend can store them.
+    """
+
+    def __init__(self, name: str, max_entries: int, ttl_seconds: int):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # counters are per process
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    async def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: Any) -> None:
+        raise NotImplementedError
+
+    async def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    async def clear(self) -> None:
+        raise NotImplementedError
+
+    def size(self) -> int:
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.__class__.__name__,
+            "size": self.size(),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class MemoryCache(CacheBackend):
+    """In-process LRU cache. Fast, but not shared between workers."""
+
+    def __init__(self, name: str, max_entries: int, ttl_seconds: int):
+        super().__init__(name, max_entries, ttl_seconds)
+        # key -> (expires_at, value), oldest entries first
+        self._data: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return None
+
+        # mark as recently used
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    async def set(self, key: str, value: Any) -> None:
+        self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    async def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    async def clear(self) -> None:
+        self._data.clear()
+
+    def size(self) -> int:
+        return len(self._data)
+
+
+class SqliteCache(CacheBackend):
+    """
+    Persistent cache stored in a local sqlite file.
+    Survives restarts and is shared by all workers on the same host.
+    """
+
+    def __init__(self, name: str, max_entries: int, ttl_seconds: int, path: str):
+        super().__init__(name, max_entries, ttl_seconds)
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_cache_entries_lru "
+                "ON cache_entries (namespace, last_access)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        # a fresh connection per call keeps us safe across worker threads
+        return sqlite3.connect(self.path, timeout=5.0)
+
+    # --- sync helpers (executed in a thread) ---
+    def _get_sync(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value, expires_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                (self.name, key),
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] < now:
+                conn.execute(
+                    "DELETE FROM cache_entries WHERE namespace = ? AND key = ?",
+                    (self.name, key),
+                )
+                return None
+            conn.execute(
+                "UPDATE cache_entries SET last_access = ? WHERE namespace = ? AND key = ?",
+                (now, self.name, key),
+            )
+            return row[0]
+
+    def _set_sync(self, key: str, raw_value: str) -> int:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (namespace, key, value, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (self.name, key, raw_value, now + self.ttl_seconds, now),
+            )
+            # drop expired rows first, then the least recently used ones
+            conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND expires_at < ?",
+                (self.name, now),
+            )
+            overflow = conn.execute(
+                "SELECT COUNT(*) FROM cache_entries WHERE namespace = ?", (self.name,)
+            ).fetchone()[0] - self.max_entries
+            if overflow > 0:
+                conn.execute(
+                    """
+                    DELETE FROM cache_entries WHERE namespace = ? AND key IN (
+                        SELECT key FROM cache_entries WHERE namespace = ?
+                        ORDER BY last_access ASC LIMIT ?
+                    )
+                    """,
+                    (self.name, self.name, overflow),
+                )
+            return max(overflow, 0)
+
+    def _delete_sync(self, key: Optional[str]) -> None:
+        with self._connect() as conn:
+            if key is None:
+                conn.execute("DELETE FROM cache_entries WHERE namespace = ?", (self.name,))
+            else:
+                conn.execute(
+                    "DELETE FROM cache_entries WHERE namespace = ? AND key = ?",
+                    (self.name, key),
+                )
+
+    # --- async interface ---
+    async def get(self, key: str) -> Optional[Any]:
+        raw = await asyncio.to_thread(self._get_sync, key)
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(raw)
+
+    async def set(self, key: str, value: Any) -> None:
+        evicted = await asyncio.to_thread(self._set_sync, key, json.dumps(value))
+        self.evictions += evicted
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self._delete_sync, key)
+
+    async def clear(self) -> None:
+        await asyncio.to_thread(self._delete_sync, None)
+
+    def size(self) -> int:
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM cache_entries WHERE namespace = ?", (self.name,)
+            ).fetchone()[0]
+
+
+def create_cache(name: str, backend: str, max_entries: int, ttl_seconds: int) -> CacheBackend:
+    """Builds a cache for the given backend name ('memory' or 'sqlite')."""
+    if backend == "memory":
+        return MemoryCache(name, max_entries, ttl_seconds)
+    if backend == "sqlite":
+        return SqliteCache(name, max_entries, ttl_seconds, settings.CACHE_SQLITE_PATH)
+    raise ValueError(f"Unknown cache backend: {backend}")
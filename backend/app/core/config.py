@@ -1,4 +1,5 @@
 # backend/app/core/config.py
+from typing import Dict
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
@@ -13,8 +14,111 @@ class Settings(BaseSettings):
     POSTGRES_HOST: str = "localhost"  # Default to localhost for local development
     POSTGRES_PORT: int = 5432
 
+    # Optional read replica for read-heavy endpoints (history, summary, stats).
+    # empty host = everything goes to the primary
+    POSTGRES_REPLICA_HOST: str = ""
+    POSTGRES_REPLICA_PORT: int = 5432
+
+    # Connection Pool (per engine, per worker process)
+    DB_ECHO: bool = False                   # log every sql statement, for local debugging only
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800     # drop connections older than this
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100      # asyncpg prepared statements per connection, 0 behind pgbouncer
+
     # AI Settings
-    OPENAI_API_KEY: str
+    # Provider is 'openai' or 'fake' (deterministic local answers, no network)
+    AI_PROVIDER: str = "openai"
+    AI_MODEL: str = "gpt-5-mini"
+    OPENAI_API_KEY: str = ""
+
+    # Fake provider (load testing)
+    FAKE_AI_LATENCY_MS: float = 800.0
+    FAKE_AI_LATENCY_JITTER_MS: float = 200.0
+    FAKE_AI_ERROR_RATE: float = 0.0         # 0..1, injected retryable errors
+    FAKE_AI_STREAM_DELAY_MS: float = 30.0   # between streamed words
+    FAKE_AI_SEED: int = 42
+
+    # Upstream AI Resilience
+    AI_TIMEOUT_SECONDS: float = 60.0          # per attempt
+    AI_MAX_CONCURRENCY: int = 16              # global cap on concurrent upstream calls
+    AI_MAX_RETRIES: int = 2
+    AI_RETRY_BASE_DELAY_SECONDS: float = 0.5
+    AI_RETRY_MAX_DELAY_SECONDS: float = 8.0
+    AI_BREAKER_FAILURE_THRESHOLD: int = 5
+    AI_BREAKER_RESET_SECONDS: float = 30.0
+    AI_HEDGE_AFTER_SECONDS: float = 0.0       # 0 disables hedged requests
+
+    # Cache Settings
+    # Backend is 'memory' (per process) or 'sqlite' (persistent, shared on one host)
+    CACHE_SQLITE_PATH: str = "var/cache.sqlite3"
+    ANALYSIS_CACHE_BACKEND: str = "memory"
+    ANALYSIS_CACHE_MAX_ENTRIES: int = 1000
+    ANALYSIS_CACHE_TTL_SECONDS: int = 60 * 60 * 24
+
+    # Chat reply cache (keyed by the normalized question)
+    CHAT_CACHE_BACKEND: str = "memory"
+    CHAT_CACHE_MAX_ENTRIES: int = 500
+    CHAT_CACHE_TTL_SECONDS: int = 60 * 60 * 6
+
+    # Authenticated-user cache (skips the users lookup on every request).
+    # writes invalidate it, but a 'memory' cache only in the worker that did the write,
+    # so run several workers with 'sqlite' (or accept up to ttl seconds of staleness)
+    USER_CACHE_BACKEND: str = "memory"
+    USER_CACHE_MAX_ENTRIES: int = 10000
+    USER_CACHE_TTL_SECONDS: int = 60
+
+    # Rate limit of the ai analysis endpoints (per client ip)
+    ANALYZE_RATE_LIMIT: str = "5/minute"
+
+    # Upload Limits
+    UPLOAD_MAX_BYTES: int = 15 * 1024 * 1024      # per image
+    REQUEST_MAX_BYTES: int = 64 * 1024 * 1024     # whole request body
+
+    # Image Storage (content-addressed, see app/services/storage_service.py)
+    STORAGE_BACKEND: str = "local"
+    STORAGE_LOCAL_ROOT: str = "app/static/media"
+    STORAGE_PUBLIC_URL: str = "/static/media"   # relative (served by this api) or absolute (cdn/bucket)
+    STORAGE_STAGING_DIR: str = "var/storage-staging"  # uploads in progress, not served
+    STORAGE_ORPHAN_GRACE_HOURS: int = 24        # unreferenced uploads are swept after this
+    STORAGE_CACHE_MAX_AGE_SECONDS: int = 60 * 60 * 24 * 365  # blobs never change, clients keep them
+
+    # Image Variants (downscaled webp copies made at upload, for lists and previews)
+    # name -> longest side in px. changing a size changes the urls, old copies stay valid
+    IMAGE_VARIANTS: Dict[str, int] = {"thumb": 160, "small": 480, "medium": 1080}
+    IMAGE_VARIANT_QUALITY: int = 75
+
+    # Batch Analysis
+    ANALYSIS_BATCH_MAX_FILES: int = 10
+    ANALYSIS_BATCH_CONCURRENCY: int = 4
+
+    # Bulk Meal Import (csv / ndjson)
+    IMPORT_BATCH_SIZE: int = 5000       # rows validated and copied per round
+    IMPORT_MAX_ROWS: int = 200_000      # per file
+
+    # Batched Meal Mutations (offline sync)
+    MEAL_BATCH_MAX_OPERATIONS: int = 500
+    IDEMPOTENCY_KEY_TTL_HOURS: int = 24 * 7   # replays older than this apply again
+
+    # Background Analysis Jobs
+    JOBS_SQLITE_PATH: str = "var/jobs.sqlite3"
+    ANALYSIS_WORKERS: int = 2               # workers inside the api process (0 = none)
+    JOB_STANDALONE_WORKERS: int = 4         # workers of `python -m app.services.analysis_jobs`
+    JOB_POLL_INTERVAL_SECONDS: float = 1.0
+    JOB_HEARTBEAT_SECONDS: float = 5.0      # every process, also how often orphaned jobs are looked for
+    JOB_STALE_SECONDS: int = 30             # a process silent this long is dead, its running jobs are requeued
+    JOB_RETENTION_HOURS: int = 24
+    JOB_EVENTS_POLL_SECONDS: float = 0.5    # sse status polling
+    JOB_EVENTS_TIMEOUT_SECONDS: int = 180
+
+    # Image Preprocessing (before the vision call)
+    IMAGE_PREPROCESS_ENABLED: bool = True
+    IMAGE_MAX_DIMENSION: int = 1024     # longest side in px
+    IMAGE_OUTPUT_FORMAT: str = "JPEG"   # 'JPEG' or 'WEBP'
+    IMAGE_QUALITY: int = 80
+    IMAGE_PROCESSING_WORKERS: int = 2
 
     # Security Settings
     SECRET_KEY: str
@@ -22,6 +126,11 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 
     REFRESH_TOKEN_EXPIRE_DAYS: int = 30
 
+    # Password Hashing
+    # changing the cost rehashes each password on its next successful login
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4      # bcrypt threads, never on the event loop
+
     # Pydantic Configuration
     # Uses .env file for local settings and ignores extra provided environment variables
     model_config = SettingsConfigDict(
@@ -41,4 +150,14 @@ class Settings(BaseSettings):
             f"{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
         )
 
+    @property
+    def SQLALCHEMY_REPLICA_URI(self) -> str:
+        """Same database on the replica host, empty when no replica is configured."""
+        if not self.POSTGRES_REPLICA_HOST:
+            return ""
+        return (
+            f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@"
+            f"{self.POSTGRES_REPLICA_HOST}:{self.POSTGRES_REPLICA_PORT}/{self.POSTGRES_DB}"
+        )
+
 settings = Settings()
\ No newline at end of file
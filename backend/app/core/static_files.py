@@ -0,0 +1,144 @@
+# backend/app/core/static_files.py
+# StaticFiles with range requests (starlette's FileResponse always sends the whole file)
+# and, for the content-addressed image storage, immutable cache headers
+
+import glob
+import os
+import re
+from typing import Optional, Tuple, Union
+
+import anyio
+from starlette.datastructures import URL, Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import FileResponse, RedirectResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Receive, Scope, Send
+
+# '<ab>/<cd>/<sha256>_<size>.webp' -> '<ab>/<cd>/<sha256>'
+_VARIANT_RE = re.compile(r"([0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64})_\d+\.webp")
+
+
+def parse_range(header: str, size: int) -> Union[Tuple[int, int], None, bool]:
+    """
+    First/last byte of a single 'bytes=' range. None means "ignore the header, send
+    everything" (malformed or multiple ranges), False means not satisfiable.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, dash, last = spec.strip().partition("-")
+    if not dash:
+        return None
+    try:
+        if not first:
+            # suffix range: the last n bytes
+            length = int(last)
+            if length <= 0:
+                return False
+            return max(size - length, 0), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size:
+        return False
+    if start > end:
+        return None
+    return start, min(end, size - 1)
+
+
+class FileRangeResponse(FileResponse):
+    """206 with one byte range of a file."""
+
+    def __init__(self, path: str, stat_result: os.stat_result, start: int, end: int, headers: dict):
+        super().__init__(path, status_code=206, headers=headers, stat_result=stat_result)
+        self.start = start
+        self.end = end
+        self.headers["content-length"] = str(end - start + 1)
+        self.headers["content-range"] = f"bytes {start}-{end}/{stat_result.st_size}"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope["method"].upper() == "HEAD":
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            await file.seek(self.start)
+            remaining = self.end - self.start + 1
+            while remaining > 0:
+                chunk = await file.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                # file got shorter while sending, end the body anyway
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+class RangeStaticFiles(StaticFiles):
+    """StaticFiles that answers 'Range: bytes=...' with 206 and sets Cache-Control."""
+
+    def __init__(self, *args, cache_control: Optional[str] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_control = cache_control
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope, status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        response = FileResponse(full_path, status_code=status_code, stat_result=stat_result)
+        response.headers["accept-ranges"] = "bytes"
+        if self.cache_control:
+            response.headers["cache-control"] = self.cache_control
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+
+        range_header = request_headers.get("range")
+        if status_code != 200 or not range_header:
+            return response
+        # If-Range: only send the part if the client's copy is still current
+        if_range = request_headers.get("if-range")
+        if if_range and if_range not in (response.headers.get("etag"), response.headers.get("last-modified")):
+            return response
+
+        size = stat_result.st_size
+        byte_range = parse_range(range_header, size)
+        if byte_range is None:
+            return response
+        if byte_range is False:
+            return Response(status_code=416, headers={"content-range": f"bytes */{size}"})
+
+        headers = {k: v for k, v in response.headers.items() if k not in ("content-length", "content-type")}
+        return FileRangeResponse(full_path, stat_result, *byte_range, headers=headers)
+
+
+class MediaFiles(RangeStaticFiles):
+    """
+    The local image storage. Keys are content hashes, so a url never changes its
+    content and clients may cache it forever. A missing size variant (image pillow
+    couldn't decode) redirects to the original.
+    """
+
+    def __init__(self, *args, max_age: int, **kwargs):
+        super().__init__(*args, cache_control=f"public, max-age={max_age}, immutable", **kwargs)
+
+    def find_original(self, path: str) -> Optional[str]:
+        """File name of the original behind a variant path, None if there is none."""
+        match = _VARIANT_RE.fullmatch(path)
+        if not match:
+            return None
+        originals = glob.glob(os.path.join(glob.escape(str(self.directory)), f"{match.group(1)}.*"))
+        return os.path.basename(originals[0]) if originals else None
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        try:
+            return await super().get_response(path, scope)
+        except HTTPException as e:
+            if e.status_code != 404:
+                raise
+            original = await anyio.to_thread.run_sync(self.find_original, path)
+            if original is None:
+                raise
+        # not under the variant url: that one must stay free for the variant if it's rendered later
+        url = URL(scope=scope)
+        url = url.replace(path=url.path.rsplit("/", 1)[0] + "/" + original)
+        return RedirectResponse(url=url, status_code=302, headers={"cache-control": "no-cache"})
@@ -0,0 +1,149 @@
+# backend/app/core/storage.py
+# blob storage for uploaded images, addressed by key ('<ab>/<cd>/<sha256>.<ext>')
+# backends are pluggable: local disk now, an s3-compatible store can implement the same interface
+
+import asyncio
+import os
+import re
+import shutil
+import uuid
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+from app.core.config import settings
+
+# sha256 sharded two levels deep: 65536 directories, so none of them grows huge
+_KEY_RE = re.compile(r"[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.[a-z0-9]{1,8}")
+
+
+def content_key(sha256: str, extension: str) -> str:
+    """Storage key of a blob with the given content hash."""
+    return f"{sha256[:2]}/{sha256[2:4]}/{sha256}.{extension}"
+
+
+def variant_key(key: str, size: int) -> str:
+    """Key of the downscaled webp copy of a blob, e.g. 'ab/cd/<sha256>_480.webp'."""
+    return f"{key.rsplit('.', 1)[0]}_{size}.webp"
+
+
+def is_valid_key(key: str) -> bool:
+    return bool(_KEY_RE.fullmatch(key))
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class StorageBackend:
+    """
+    Base interface for all storages. Blobs are immutable: a key is derived from
+    the content, so writing an existing key again is a no-op.
+    """
+
+    def __init__(self, public_url: str):
+        self.public_url = public_url.rstrip("/")
+
+    def staging_path(self) -> str:
+        """A fresh local path to write an incoming upload to, before put()."""
+        raise NotImplementedError
+
+    async def put(self, key: str, source_path: str) -> bool:
+        """Moves the staged file in under key. False if the blob was already stored."""
+        raise NotImplementedError
+
+    async def discard(self, staged_path: str) -> None:
+        """Drops a staged file that won't be put (missing files are fine)."""
+        await asyncio.to_thread(_remove_quietly, staged_path)
+
+    async def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    async def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def local_path(self, key: str) -> Optional[str]:
+        """Path on this machine (for the ai / pillow), None for remote stores."""
+        raise NotImplementedError
+
+    def url(self, key: str) -> str:
+        """Public url of a blob, relative to the api unless public_url is absolute."""
+        return f"{self.public_url}/{key}"
+
+    def key_from_url(self, url: Optional[str]) -> Optional[str]:
+        """
+        The key behind a url this storage handed out, relative or absolute
+        (the api returns absolute urls and clients send them back). None for anything else.
+        """
+        if not url:
+            return None
+        prefix = self.public_url + "/"
+        if not url.startswith(prefix):
+            path = urlsplit(url).path
+            if not (prefix.startswith("/") and path.startswith(prefix)):
+                return None
+            url = path
+        key = url[len(prefix):]
+        return key if is_valid_key(key) else None
+
+    def variant_urls(self, url: Optional[str]) -> Optional[Dict[str, str]]:
+        """
+        Urls of the size variants (IMAGE_VARIANTS) of a stored image, on the same
+        host as url. None for images that aren't ours (old uploads, external links).
+        """
+        key = self.key_from_url(url)
+        if not key:
+            return None
+        base = url[:-len(key)] if url.endswith(key) else self.url(key)[:-len(key)]
+        return {name: base + variant_key(key, size) for name, size in settings.IMAGE_VARIANTS.items()}
+
+
+class LocalStorage(StorageBackend):
+    """Files under a local directory, served by the /static mount (or nginx)."""
+
+    def __init__(self, root: str, public_url: str, staging_dir: str):
+        super().__init__(public_url)
+        self.root = root
+        # outside the served directory, half-written uploads are never visible
+        self.staging_dir = staging_dir
+        os.makedirs(self.staging_dir, exist_ok=True)
+
+    def staging_path(self) -> str:
+        return os.path.join(self.staging_dir, f"{uuid.uuid4()}.part")
+
+    def _put(self, key: str, source_path: str) -> bool:
+        target = os.path.join(self.root, key)
+        if os.path.exists(target):
+            # same content is already there, keep the stored copy
+            _remove_quietly(source_path)
+            return False
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        # a rename on the same filesystem, a copy otherwise
+        shutil.move(source_path, target)
+        return True
+
+    async def put(self, key: str, source_path: str) -> bool:
+        return await asyncio.to_thread(self._put, key, source_path)
+
+    async def exists(self, key: str) -> bool:
+        return await asyncio.to_thread(os.path.exists, os.path.join(self.root, key))
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(_remove_quietly, os.path.join(self.root, key))
+
+    def local_path(self, key: str) -> Optional[str]:
+        return os.path.join(self.root, key)
+
+
+def create_storage(backend: str) -> StorageBackend:
+    """Builds the storage for the given backend name ('local')."""
+    if backend == "local":
+        return LocalStorage(
+            settings.STORAGE_LOCAL_ROOT, settings.STORAGE_PUBLIC_URL, settings.STORAGE_STAGING_DIR
+        )
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+
+storage = create_storage(settings.STORAGE_BACKEND)
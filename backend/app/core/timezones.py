@@ -0,0 +1,42 @@
+# backend/app/core/timezones.py
+# per-user calendar days.
+# a "day" is always the user's local day, turned into a half-open utc timestamp range
+# [start, end) for queries, so the (user_id, created_at) index can serve them.
+
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+DEFAULT_TIMEZONE = "UTC"
+
+
+def is_valid_timezone(name: str) -> bool:
+    try:
+        ZoneInfo(name)
+        return True
+    except (ZoneInfoNotFoundError, ValueError):
+        return False
+
+
+def get_zone(name: str) -> ZoneInfo:
+    """IANA name -> ZoneInfo, unknown names fall back to utc."""
+    try:
+        return ZoneInfo(name or DEFAULT_TIMEZONE)
+    except (ZoneInfoNotFoundError, ValueError):
+        return ZoneInfo(DEFAULT_TIMEZONE)
+
+
+def local_today(tz: ZoneInfo) -> date:
+    return datetime.now(tz).date()
+
+
+def local_day(moment: datetime, tz: ZoneInfo) -> date:
+    """The user's calendar day of an aware timestamp."""
+    return moment.astimezone(tz).date()
+
+
+def day_range(first_day: date, last_day: date, tz: ZoneInfo) -> Tuple[datetime, datetime]:
+    """[local midnight of first_day, local midnight after last_day) as utc timestamps."""
+    start = datetime.combine(first_day, time.min, tzinfo=tz)
+    end = datetime.combine(last_day + timedelta(days=1), time.min, tzinfo=tz)
+    return start.astimezone(timezone.utc), end.astimezone(timezone.utc)
@@ -3,12 +3,32 @@ from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
 
-# Initialize the asynchronous SQLAlchemy engine
-# Echo is enabled to log SQL queries for easier debugging during development
-engine = create_async_engine(
-    settings.SQLALCHEMY_DATABASE_URI, 
-    echo=True,
-    future=True
+def _create_engine(url: str):
+    # pool and driver settings come from Settings (DB_*)
+    return create_async_engine(
+        url,
+        echo=settings.DB_ECHO,
+        future=True,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args={
+            # asyncpg's own statement cache and sqlalchemy's cache on top of it
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        },
+    )
+
+# Initialize the asynchronous SQLAlchemy engine (primary, all writes go here)
+engine = _create_engine(settings.SQLALCHEMY_DATABASE_URI)
+
+# Optional read-only engine for a replica, falls back to the primary
+read_engine = (
+    _create_engine(settings.SQLALCHEMY_REPLICA_URI)
+    if settings.SQLALCHEMY_REPLICA_URI
+    else engine
 )
 
 # Configure the session factory for asynchronous database interactions
@@ -19,4 +39,13 @@ SessionLocal = sessionmaker(
     bind=engine, 
     class_=AsyncSession,
     expire_on_commit=False
-)
\ No newline at end of file
+)
+
+# Sessions for read-only endpoints. A replica can lag a little behind the primary
+ReadSessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False
+)
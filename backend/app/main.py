@@ -3,24 +3,35 @@ import time
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 
 from app.core.config import settings
+from app.core.static_files import MediaFiles, RangeStaticFiles
 from app.api.api import api_router
 from app.api.endpoints import chat
+from app.services.analysis_service import analysis_cache
+from app.services.image_service import image_stats
+from app.services.analysis_jobs import start_workers, stop_workers, job_stats
+from app.services.openai_service import analysis_flight, chat_flight, ai_caller
+from app.services.chat_service import chat_cache
+from app.services.user_cache import user_cache
 
 # --- DATABASE IMPORTS ---
-from app.db.session import engine
+from app.db.session import engine, read_engine
 from app.db.base import Base
 # Import models to ensure they are registered with Base.metadata
 # (Even if unused here, the import is necessary for table creation)
 try:
     from app.models.user import User
     from app.models.meal import Meal
+    from app.models.daily_total import DailyTotal
+    from app.models.idempotency_key import IdempotencyKey
+    from app.models.meal_tombstone import MealTombstone
+    from app.models.stored_image import StoredImage
 except ImportError:
     print("⚠️ Warning: Could not import models. Tables might not be created correctly.")
 
@@ -38,9 +49,16 @@ async def lifespan(app: FastAPI):
         print("✅ STARTUP: Database tables checked/created successfully.")
     except Exception as e:
         print(f"❌ STARTUP ERROR: Could not create tables. Reason: {e}")
+
+    # Background workers for /meals/analyze/jobs
+    await start_workers(settings.ANALYSIS_WORKERS)
     
     yield
-    # Code after yield runs on shutdown (nothing needed here)
+    # Code after yield runs on shutdown
+    await stop_workers()
+    await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
 
 # Setup rate limiter by remote address
 limiter = Limiter(key_func=get_remote_address)
@@ -62,8 +80,16 @@ app.add_middleware(
 )
 
 # Static files setup (for images)
+# stored images first: content-addressed, so cached as immutable (before /static, which contains them)
+if settings.STORAGE_BACKEND == "local" and settings.STORAGE_PUBLIC_URL.startswith("/"):
+    os.makedirs(settings.STORAGE_LOCAL_ROOT, exist_ok=True)
+    app.mount(
+        settings.STORAGE_PUBLIC_URL,
+        MediaFiles(directory=settings.STORAGE_LOCAL_ROOT, max_age=settings.STORAGE_CACHE_MAX_AGE_SECONDS),
+        name="media",
+    )
 os.makedirs("app/static", exist_ok=True)
-app.mount("/static", StaticFiles(directory="app/static"), name="static")
+app.mount("/static", RangeStaticFiles(directory="app/static"), name="static")
 
 # Middleware to log requests and execution time
 @app.middleware("http")
@@ -81,6 +107,14 @@ async def log_requests(request: Request, call_next):
     
     return response
 
+# Reject oversized bodies before they are parsed and spooled to disk
+@app.middleware("http")
+async def limit_request_size(request: Request, call_next):
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > settings.REQUEST_MAX_BYTES:
+        return JSONResponse(status_code=413, content={"detail": "Request body too large"})
+    return await call_next(request)
+
 # Include all routers
 # 1. Standard API (login, users, meals)
 app.include_router(api_router, prefix=settings.API_V1_STR)
@@ -92,6 +126,26 @@ app.include_router(chat.router, prefix="/api/v1/chat", tags=["chat"])
 async def health_check():
     return {"status": "ok", "service": "smart calorie tracker", "version": "1.0.0"}
 
+# Runtime counters (caches etc.) for monitoring
+@app.get("/metrics")
+async def metrics():
+    return {
+        "analysis_cache": analysis_cache.stats(),
+        "image_preprocessing": image_stats,
+        "analysis_jobs": await job_stats(),
+        "chat_cache": chat_cache.stats(),
+        "user_cache": user_cache.stats(),
+        "db_pool": {
+            "primary": engine.pool.status(),
+            "replica": read_engine.pool.status() if read_engine is not engine else None,
+        },
+        "ai_upstream": ai_caller.stats(),
+        "ai_singleflight": {
+            "analysis": analysis_flight.stats(),
+            "chat": chat_flight.stats(),
+        },
+    }
+
 # Root endpoint
 @app.get("/")
 async def root():
@@ -0,0 +1,18 @@
+# backend/app/models/daily_total.py
+# per-user, per-day nutrition rollup (kept in sync with meals on every write)
+
+from sqlalchemy import Column, Integer, Float, Date, ForeignKey
+from app.db.base import Base
+
+class DailyTotal(Base):
+    __tablename__ = "daily_totals"
+
+    # rows go away together with the user (db-level cascade)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+
+    calories = Column(Integer, nullable=False, default=0)
+    protein = Column(Float, nullable=False, default=0.0)
+    fats = Column(Float, nullable=False, default=0.0)
+    carbs = Column(Float, nullable=False, default=0.0)
+    meal_count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,16 @@
+# backend/app/models/idempotency_key.py
+# results of already applied offline-sync operations, so replays don't apply twice
+
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    key = Column(String(128), primary_key=True)
+
+    # {"status_code": ..., "meal": {...}}, null while the claiming transaction runs
+    result = Column(JSON, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -1,7 +1,7 @@
 # backend/app/models/meal.py
 # sqlalchemy model definition (db schema)
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, BigInteger, String, Float, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.base import Base
@@ -26,6 +26,16 @@ class Meal(Base):
     
     created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
 
+    # user's sync_version at the last write of this meal (delta sync)
+    version = Column(BigInteger, nullable=False, default=0, server_default="0")
+
     # relationship back to user
     # this corresponds to 'meals' in user model
-    owner = relationship("User", back_populates="meals")
\ No newline at end of file
+    owner = relationship("User", back_populates="meals")
+
+    # per-user time range queries (summary, stats, history) are served by this index.
+    # id is the tie-breaker of the history cursor, so keyset pages are a pure index walk
+    __table_args__ = (
+        Index("ix_meals_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_meals_user_id_version_id", "user_id", "version", "id"),
+    )
\ No newline at end of file
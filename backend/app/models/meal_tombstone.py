@@ -0,0 +1,18 @@
+# backend/app/models/meal_tombstone.py
+# deleted meals, so delta sync can tell clients what to remove
+
+from sqlalchemy import Column, Integer, BigInteger, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+class MealTombstone(Base):
+    __tablename__ = "meal_tombstones"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    meal_id = Column(Integer, primary_key=True)  # no fk, the meal row is gone
+    version = Column(BigInteger, nullable=False)
+    deleted_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_meal_tombstones_user_id_version", "user_id", "version"),
+    )
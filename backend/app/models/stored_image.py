@@ -0,0 +1,22 @@
+# backend/app/models/stored_image.py
+# content-addressed image blobs and how many meals reference them
+
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Index, text
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+class StoredImage(Base):
+    __tablename__ = "stored_images"
+
+    # storage key, '<ab>/<cd>/<sha256>.<ext>'
+    key = Column(String(160), primary_key=True)
+    size = Column(BigInteger, nullable=True)  # unknown for keys only seen in meals
+    refcount = Column(Integer, nullable=False, server_default="0")
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # touched on every upload and reference change, the sweep keeps recent blobs
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        # only the unreferenced blobs, that's all the sweep looks at
+        Index("ix_stored_images_unreferenced", "updated_at", postgresql_where=text("refcount <= 0")),
+    )
@@ -1,7 +1,7 @@
 # backend/app/models/user.py
 # FINAL VERSION: Added relationships for cascade delete
 
-from sqlalchemy import Column, Integer, String, Float, DateTime
+from sqlalchemy import Column, Integer, BigInteger, String, Float, DateTime
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.base import Base
@@ -21,6 +21,10 @@ class User(Base):
     gender = Column(String, nullable=True)      # 'male' or 'female'
     activity_level = Column(String, nullable=True) # e.g. 'sedentary'
     calories_goal = Column(Integer, default=2000) # target daily intake
+    # IANA name, e.g. 'Europe/Kyiv'. daily totals and date filters use the user's local day
+    timezone = Column(String, nullable=False, default="UTC", server_default="UTC")
+    # bumped by every transaction that changes meals, see sync_service
+    sync_version = Column(BigInteger, nullable=False, default=0, server_default="0")
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
@@ -1,7 +1,9 @@
 # backend/app/schemas/meal.py
-from pydantic import BaseModel, ConfigDict
-from typing import Optional, List
-from datetime import datetime
+from pydantic import BaseModel, ConfigDict, Field, computed_field, model_validator
+from typing import Dict, Optional, List, Literal
+from datetime import date, datetime
+
+from app.core.storage import storage
 
 class MealBase(BaseModel):
     name: str
@@ -15,6 +17,10 @@ class MealBase(BaseModel):
 class MealCreate(MealBase):
     pass
 
+# --- NEW: Bulk Import ---
+class MealImportRow(MealCreate):
+    created_at: Optional[datetime] = None  # without offset = user's local time, missing = now
+
 class MealUpdate(BaseModel):
     name: Optional[str] = None
     calories: Optional[int] = None
@@ -28,9 +34,16 @@ class Meal(MealBase):
     id: int
     user_id: int
     created_at: datetime
+    version: int = 0  # sync version of the last change
 
     model_config = ConfigDict(from_attributes=True)
 
+    # {"thumb": url, "small": url, "medium": url}, null for images not in our storage
+    @computed_field
+    @property
+    def image_variants(self) -> Optional[Dict[str, str]]:
+        return storage.variant_urls(self.image_url)
+
 # --- NEW: Pagination Wrapper ---
 class MealPagination(BaseModel):
     items: List[Meal]
@@ -39,6 +52,67 @@ class MealPagination(BaseModel):
     size: int
     pages: int
 
+# --- NEW: Cursor Pagination (meal history) ---
+class MealCursorPage(BaseModel):
+    items: List[Meal]
+    next_cursor: Optional[str] = None  # None on the last page
+    size: int
+    total: Optional[int] = None  # only with include_total=true
+
+# --- NEW: Delta Sync ---
+class MealChanges(BaseModel):
+    version: int            # send as `since` next time, once next_cursor is None
+    meals: List[Meal]       # created or changed since `since`
+    deleted_ids: List[int]  # deleted since `since` (first page only)
+    next_cursor: Optional[str] = None
+
+# --- NEW: Bulk Import Result ---
+class MealImportError(BaseModel):
+    row: int  # data row (csv, header excluded) or line (ndjson), 1-based
+    error: str
+
+class MealImportResult(BaseModel):
+    imported: int
+    failed: int
+    errors: List[MealImportError]  # first 100
+    errors_truncated: bool
+
+# --- NEW: Batched Mutations (offline sync) ---
+class MealBatchOperation(BaseModel):
+    op: Literal["create", "update", "delete"]
+    idempotency_key: str = Field(..., min_length=1, max_length=128)
+    meal_id: Optional[int] = None           # update / delete
+    meal: Optional[MealImportRow] = None    # create (created_at = when it was eaten offline)
+    changes: Optional[MealUpdate] = None    # update
+
+    @model_validator(mode="after")
+    def check_fields(self):
+        if self.op == "create" and self.meal is None:
+            raise ValueError("'meal' is required for create")
+        if self.op in ("update", "delete") and self.meal_id is None:
+            raise ValueError(f"'meal_id' is required for {self.op}")
+        if self.op == "update" and self.changes is None:
+            raise ValueError("'changes' is required for update")
+        return self
+
+class MealBatchRequest(BaseModel):
+    operations: List[MealBatchOperation]
+
+class MealBatchItemResult(BaseModel):
+    index: int
+    idempotency_key: str
+    op: str
+    status: str  # 'applied', 'replayed' (same key seen before) or 'failed'
+    status_code: int
+    meal: Optional[Meal] = None
+    error: Optional[str] = None
+
+class MealBatchResponse(BaseModel):
+    results: List[MealBatchItemResult]
+    applied: int
+    replayed: int
+    failed: int
+
 # --- NEW: AI Analysis Response ---
 class FoodAnalysisResponse(BaseModel):
     name: str
@@ -49,4 +123,53 @@ class FoodAnalysisResponse(BaseModel):
     weight_grams: int
     is_food: bool
     image_url: str
-    confidence: Optional[float] = None
\ No newline at end of file
+    confidence: Optional[float] = None
+
+    @computed_field
+    @property
+    def image_variants(self) -> Optional[Dict[str, str]]:
+        return storage.variant_urls(self.image_url)
+
+# --- NEW: Batch AI Analysis ---
+class BatchAnalysisItem(BaseModel):
+    index: int
+    filename: Optional[str] = None
+    ok: bool
+    result: Optional[FoodAnalysisResponse] = None
+    status_code: Optional[int] = None
+    error: Optional[str] = None
+
+class BatchAnalysisResponse(BaseModel):
+    results: List[BatchAnalysisItem]
+    succeeded: int
+    failed: int
+
+# --- NEW: Background AI Analysis Jobs ---
+class AnalysisJobCreated(BaseModel):
+    job_id: str
+    status: str
+
+class AnalysisJob(BaseModel):
+    job_id: str
+    status: str  # 'queued', 'running', 'done', 'failed'
+    result: Optional[FoodAnalysisResponse] = None
+    status_code: Optional[int] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+# --- NEW: Range Statistics ---
+class StatsBucket(BaseModel):
+    date: date  # first day of the bucket (monday for weeks, the 1st for months)
+    total_calories: int
+    total_protein: float
+    total_fats: float
+    total_carbs: float
+    meal_count: int
+    days_logged: int
+
+class RangeStats(BaseModel):
+    start_date: date
+    end_date: date
+    bucket: str
+    items: List[StatsBucket]
@@ -2,7 +2,9 @@
 # FINAL VERSION: Added NewPassword schema for reset flow
 
 from typing import Optional
-from pydantic import BaseModel, EmailStr, ConfigDict
+from pydantic import BaseModel, EmailStr, ConfigDict, field_validator
+
+from app.core.timezones import is_valid_timezone
 
 # Shared properties
 class UserBase(BaseModel):
@@ -29,6 +31,14 @@ class UserUpdate(BaseModel):
     gender: Optional[str] = None
     activity_level: Optional[str] = None
     calories_goal: Optional[int] = None # Allow manual override if needed
+    timezone: Optional[str] = None # IANA name, e.g. 'Europe/Kyiv'
+
+    @field_validator("timezone")
+    @classmethod
+    def check_timezone(cls, value: Optional[str]) -> Optional[str]:
+        if value is not None and not is_valid_timezone(value):
+            raise ValueError("Unknown timezone, use an IANA name like 'Europe/Kyiv'")
+        return value
 
 class UserUpdatePassword(BaseModel):
     current_password: str
@@ -44,5 +54,6 @@ class NewPassword(BaseModel):
 class User(UserBase):
     id: int
     calories_goal: Optional[int] = 2000
+    timezone: str = "UTC"
     
     model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
@@ -0,0 +1,185 @@
+# backend/app/services/ai_providers.py
+# ai backends behind one small interface, selected with settings.AI_PROVIDER:
+#   'openai' - the real model
+#   'fake'   - deterministic local answers with injectable latency and errors,
+#              for load tests and measuring our own overhead without network access
+
+import asyncio
+import hashlib
+import json
+import random
+from typing import AsyncIterator, List, Optional, Tuple
+
+from openai import AsyncOpenAI
+
+from app.core.config import settings
+from app.services.resilience import TransientUpstreamError
+
+VISION_SYSTEM_PROMPT = """
+                    You are a professional nutritionist. Look at the image and provide:
+                    1. Food name. 2. Calories. 3. Protein. 4. Fats. 5. Carbs. 6. Estimated weight.
+                    Return ONLY valid JSON. keys: name, calories, protein, fats, carbs, weight_grams, is_food.
+                    If it's not food, set 'is_food': false.
+                    """
+
+
+class AIProvider:
+    """Interface every ai backend implements. Upstream errors are raised, not swallowed."""
+
+    name = "base"
+
+    async def analyze_image(self, base64_image: str, mime_type: str) -> str:
+        """Returns the raw JSON text of the food analysis."""
+        raise NotImplementedError
+
+    async def complete_chat(self, messages: List[dict]) -> Tuple[Optional[str], Optional[str]]:
+        """Returns (content, finish_reason)."""
+        raise NotImplementedError
+
+    async def open_chat_stream(self, messages: List[dict]) -> AsyncIterator[Tuple[Optional[str], Optional[str]]]:
+        """Returns an async iterator of (content delta, finish_reason) pairs."""
+        raise NotImplementedError
+
+
+class OpenAIProvider(AIProvider):
+    name = "openai"
+
+    def __init__(self):
+        # SDK retries are off, retries/backoff are handled by the resilient caller
+        self.client = AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            timeout=settings.AI_TIMEOUT_SECONDS,
+            max_retries=0
+        )
+        self.model = settings.AI_MODEL
+
+    async def analyze_image(self, base64_image: str, mime_type: str) -> str:
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": VISION_SYSTEM_PROMPT},
+                {
+                    "role": "user",
+                    "content": [
+                        {"type": "text", "text": "Analyze this meal in detail."},
+                        {
+                            "type": "image_url",
+                            "image_url": {"url": f"data:{mime_type};base64,{base64_image}"}
+                        }
+                    ],
+                }
+            ],
+            # INCREASED: Giving more room for vision analysis
+            extra_body={"max_completion_tokens": 2000},
+            response_format={"type": "json_object"}
+        )
+        return response.choices[0].message.content
+
+    async def complete_chat(self, messages: List[dict]) -> Tuple[Optional[str], Optional[str]]:
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            # INCREASED: From 1500 to 5000.
+            # Reasoning models consume tokens for thinking before outputting text.
+            extra_body={"max_completion_tokens": 5000}
+        )
+        choice = response.choices[0]
+        return choice.message.content, choice.finish_reason
+
+    async def open_chat_stream(self, messages: List[dict]):
+        stream = await self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            extra_body={"max_completion_tokens": 5000},
+            stream=True
+        )
+        return self._iterate(stream)
+
+    @staticmethod
+    async def _iterate(stream):
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            choice = chunk.choices[0]
+            content = choice.delta.content if choice.delta else None
+            yield content, choice.finish_reason
+
+
+FAKE_FOODS = [
+    ("Chicken salad", 350, 32.0, 18.0, 12.0, 300),
+    ("Oatmeal with berries", 280, 9.0, 6.0, 48.0, 250),
+    ("Pasta bolognese", 620, 28.0, 22.0, 75.0, 400),
+    ("Salmon with rice", 540, 35.0, 20.0, 52.0, 380),
+    ("Greek yogurt", 150, 15.0, 4.0, 12.0, 170),
+]
+
+
+class FakeProvider(AIProvider):
+    """
+    Deterministic stand-in for the real model: the same input always gives the same answer.
+    Latency and error rate are configurable (FAKE_AI_*).
+    """
+
+    name = "fake"
+
+    def __init__(self):
+        self._random = random.Random(settings.FAKE_AI_SEED)
+
+    async def _simulate_upstream(self) -> None:
+        jitter = self._random.uniform(-1, 1) * settings.FAKE_AI_LATENCY_JITTER_MS
+        await asyncio.sleep(max(0.0, settings.FAKE_AI_LATENCY_MS + jitter) / 1000)
+        if self._random.random() < settings.FAKE_AI_ERROR_RATE:
+            raise TransientUpstreamError("fake provider: injected error")
+
+    @staticmethod
+    def _pick(text: str, options: list):
+        digest = hashlib.sha256(text.encode("utf-8")).digest()
+        return options[digest[0] % len(options)]
+
+    async def analyze_image(self, base64_image: str, mime_type: str) -> str:
+        await self._simulate_upstream()
+        name, calories, protein, fats, carbs, weight = self._pick(base64_image, FAKE_FOODS)
+        return json.dumps({
+            "name": name,
+            "calories": calories,
+            "protein": protein,
+            "fats": fats,
+            "carbs": carbs,
+            "weight_grams": weight,
+            "is_food": True,
+        })
+
+    def _reply_for(self, messages: List[dict]) -> str:
+        question = messages[-1]["content"]
+        tip = self._pick(question, [
+            "Aim for a palm-sized portion of protein with every meal.",
+            "Fill half of your plate with vegetables.",
+            "Whole grains keep you full longer than refined ones.",
+            "Drink a glass of water before each meal.",
+        ])
+        return f"Great question! {tip}"
+
+    async def complete_chat(self, messages: List[dict]) -> Tuple[Optional[str], Optional[str]]:
+        await self._simulate_upstream()
+        return self._reply_for(messages), "stop"
+
+    async def open_chat_stream(self, messages: List[dict]):
+        await self._simulate_upstream()
+        return self._iterate(self._reply_for(messages))
+
+    @staticmethod
+    async def _iterate(reply: str):
+        words = reply.split(" ")
+        for i, word in enumerate(words):
+            await asyncio.sleep(settings.FAKE_AI_STREAM_DELAY_MS / 1000)
+            yield (word if i == 0 else f" {word}"), None
+        yield None, "stop"
+
+
+def create_provider() -> AIProvider:
+    if settings.AI_PROVIDER == "openai":
+        return OpenAIProvider()
+    if settings.AI_PROVIDER == "fake":
+        print("🧪 [AI_PROVIDER] Using the fake ai provider, no real model calls are made")
+        return FakeProvider()
+    raise ValueError(f"Unknown AI provider: {settings.AI_PROVIDER}")
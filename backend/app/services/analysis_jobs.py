@@ -0,0 +1,330 @@
+# backend/app/services/analysis_jobs.py
+# background analysis jobs: the request only stores the upload and gets a job id,
+# a pool of workers runs the ai call. jobs live in a local sqlite file so they
+# survive restarts and can be processed by a separate worker process:
+#   python -m app.services.analysis_jobs
+# every process heartbeats under its own id and running jobs record that id,
+# so jobs of a process that stopped or crashed go back to the queue.
+
+import asyncio
+import json
+import os
+import sqlite3
+import time
+import uuid
+from typing import List, Optional
+
+from app.core.config import settings
+from app.services.analysis_service import analyze_image_cached
+from app.services.resilience import AIServiceError
+from app.services.upload_service import StoredUpload
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+FINAL_STATUSES = (STATUS_DONE, STATUS_FAILED)
+
+# this process, new on every start
+WORKER_ID = uuid.uuid4().hex
+
+
+class JobStore:
+    """Sqlite-backed job table. All methods are sync, call them via threads."""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS analysis_jobs (
+                    id TEXT PRIMARY KEY,
+                    user_id INTEGER NOT NULL,
+                    status TEXT NOT NULL,
+                    image_path TEXT NOT NULL,
+                    image_url TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    status_code INTEGER,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_analysis_jobs_status "
+                "ON analysis_jobs (status, created_at)"
+            )
+            # files from before owners existed
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(analysis_jobs)")}
+            if "owner" not in columns:
+                conn.execute("ALTER TABLE analysis_jobs ADD COLUMN owner TEXT")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS job_workers (
+                    id TEXT PRIMARY KEY,
+                    pid INTEGER NOT NULL,
+                    heartbeat_at REAL NOT NULL
+                )
+                """
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10.0)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def create(self, user_id: int, upload: StoredUpload) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO analysis_jobs
+                    (id, user_id, status, image_path, image_url, content_hash, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (job_id, user_id, STATUS_QUEUED, upload.path, upload.relative_url,
+                 upload.sha256, now, now),
+            )
+        return job_id
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM analysis_jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def claim_next(self, owner: str) -> Optional[dict]:
+        """Atomically moves the oldest queued job to 'running' (owned by owner) and returns it."""
+        conn = self._connect()
+        conn.isolation_level = None
+        try:
+            # immediate lock so two workers (or processes) never claim the same job
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT * FROM analysis_jobs WHERE status = ? ORDER BY created_at LIMIT 1",
+                (STATUS_QUEUED,),
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE analysis_jobs SET status = ?, owner = ?, updated_at = ? WHERE id = ?",
+                (STATUS_RUNNING, owner, time.time(), row["id"]),
+            )
+            conn.execute("COMMIT")
+            return dict(row)
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    # finish/fail only count for the owner, a requeued job may be running elsewhere by now
+    def finish(self, job_id: str, owner: str, result: dict) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE analysis_jobs SET status = ?, result = ?, updated_at = ? "
+                "WHERE id = ? AND status = ? AND owner = ?",
+                (STATUS_DONE, json.dumps(result), time.time(), job_id, STATUS_RUNNING, owner),
+            )
+
+    def fail(self, job_id: str, owner: str, error: str, status_code: int) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE analysis_jobs SET status = ?, error = ?, status_code = ?, updated_at = ? "
+                "WHERE id = ? AND status = ? AND owner = ?",
+                (STATUS_FAILED, error, status_code, time.time(), job_id, STATUS_RUNNING, owner),
+            )
+
+    def heartbeat(self, worker_id: str) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO job_workers (id, pid, heartbeat_at) VALUES (?, ?, ?)",
+                (worker_id, os.getpid(), time.time()),
+            )
+
+    def unregister(self, worker_id: str) -> int:
+        """Clean shutdown: the jobs this process was running go back to the queue right away."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM job_workers WHERE id = ?", (worker_id,))
+            cursor = conn.execute(
+                "UPDATE analysis_jobs SET status = ?, owner = NULL, updated_at = ? "
+                "WHERE status = ? AND owner = ?",
+                (STATUS_QUEUED, time.time(), STATUS_RUNNING, worker_id),
+            )
+            return cursor.rowcount
+
+    def requeue_orphaned(self, dead_after_seconds: float) -> int:
+        """
+        Jobs left 'running' by a process without a recent heartbeat (crashed, killed,
+        restarted) go back to the queue. Jobs of live processes are left alone.
+        """
+        now = time.time()
+        cutoff = now - dead_after_seconds
+        with self._connect() as conn:
+            conn.execute("DELETE FROM job_workers WHERE heartbeat_at < ?", (cutoff,))
+            cursor = conn.execute(
+                "UPDATE analysis_jobs SET status = ?, owner = NULL, updated_at = ? "
+                "WHERE status = ? AND (owner IS NULL OR owner NOT IN (SELECT id FROM job_workers))",
+                (STATUS_QUEUED, now, STATUS_RUNNING),
+            )
+            return cursor.rowcount
+
+    def prune(self, older_than_seconds: int) -> int:
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "DELETE FROM analysis_jobs WHERE status IN (?, ?) AND updated_at < ?",
+                (*FINAL_STATUSES, time.time() - older_than_seconds),
+            )
+            return cursor.rowcount
+
+    def counts(self) -> dict:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT status, COUNT(*) FROM analysis_jobs GROUP BY status"
+            ).fetchall()
+            (live,) = conn.execute("SELECT COUNT(*) FROM job_workers").fetchone()
+        return {"jobs": {status: count for status, count in rows}, "live_processes": live}
+
+
+job_store = JobStore(settings.JOBS_SQLITE_PATH)
+
+# wakes idle workers in this process as soon as a job is submitted
+_wakeup = asyncio.Event()
+_workers: List[asyncio.Task] = []
+_maintenance: Optional[asyncio.Task] = None
+
+
+async def submit_job(user_id: int, upload: StoredUpload) -> str:
+    job_id = await asyncio.to_thread(job_store.create, user_id, upload)
+    _wakeup.set()
+    return job_id
+
+
+async def get_job(job_id: str) -> Optional[dict]:
+    return await asyncio.to_thread(job_store.get, job_id)
+
+
+async def _process(job: dict) -> None:
+    # failed jobs leave their image unreferenced, the storage sweep removes it
+    try:
+        analysis = await analyze_image_cached(job["image_path"], job["content_hash"])
+    except AIServiceError as e:
+        print(f"❌ [JOB_ERROR] {job['id']}: {e}")
+        await asyncio.to_thread(job_store.fail, job["id"], WORKER_ID, "ai service unavailable", 503)
+        return
+    except Exception as e:
+        print(f"❌ [JOB_ERROR] {job['id']}: {e}")
+        analysis = None
+
+    if not analysis:
+        await asyncio.to_thread(job_store.fail, job["id"], WORKER_ID, "ai analysis failed", 500)
+        return
+
+    if analysis["is_food"] is False:
+        await asyncio.to_thread(job_store.fail, job["id"], WORKER_ID, "ai did not detect food", 400)
+        return
+
+    # image_url stays relative here, the api turns it into an absolute url
+    await asyncio.to_thread(job_store.finish, job["id"], WORKER_ID, {**analysis, "image_url": job["image_url"]})
+
+
+async def _worker_loop(worker_id: int) -> None:
+    print(f"👷 [JOB_WORKER] Worker {worker_id} started")
+    while True:
+        try:
+            job = await asyncio.to_thread(job_store.claim_next, WORKER_ID)
+        except Exception as e:
+            print(f"❌ [JOB_WORKER] Could not claim job: {e}")
+            job = None
+
+        if job is None:
+            # sleep until a local submit, or poll again for jobs from other processes
+            _wakeup.clear()
+            try:
+                await asyncio.wait_for(_wakeup.wait(), timeout=settings.JOB_POLL_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            continue
+
+        started = time.perf_counter()
+        try:
+            await _process(job)
+        except Exception as e:
+            # never let one broken job kill the worker
+            print(f"❌ [JOB_WORKER] Job {job['id']} crashed: {e}")
+            continue
+        print(f"✅ [JOB_WORKER] {job['id']} finished in {time.perf_counter() - started:.2f}s")
+
+
+async def _maintain() -> None:
+    """Heartbeat of this process, recovery of orphaned jobs and pruning, all periodic."""
+    last_prune = 0.0
+    while True:
+        try:
+            await asyncio.to_thread(job_store.heartbeat, WORKER_ID)
+            requeued = await asyncio.to_thread(job_store.requeue_orphaned, settings.JOB_STALE_SECONDS)
+            pruned = 0
+            if time.monotonic() - last_prune > 3600:
+                pruned = await asyncio.to_thread(job_store.prune, settings.JOB_RETENTION_HOURS * 3600)
+                last_prune = time.monotonic()
+            if requeued or pruned:
+                print(f"🔄 [JOBS] Requeued {requeued} interrupted jobs, pruned {pruned} old jobs")
+                _wakeup.set()
+        except Exception as e:
+            print(f"❌ [JOBS] Maintenance failed: {e}")
+        await asyncio.sleep(settings.JOB_HEARTBEAT_SECONDS)
+
+
+async def start_workers(count: int) -> None:
+    """Registers this process, recovers interrupted jobs and starts `count` worker tasks."""
+    global _maintenance
+    # first heartbeat and recovery before any worker claims
+    await asyncio.to_thread(job_store.heartbeat, WORKER_ID)
+    _maintenance = asyncio.create_task(_maintain())
+
+    for i in range(count):
+        _workers.append(asyncio.create_task(_worker_loop(i)))
+
+
+async def stop_workers() -> None:
+    global _maintenance
+    tasks = _workers + ([_maintenance] if _maintenance else [])
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    _workers.clear()
+    _maintenance = None
+
+    requeued = await asyncio.to_thread(job_store.unregister, WORKER_ID)
+    if requeued:
+        print(f"🔄 [JOBS] Handed {requeued} unfinished jobs back to the queue")
+
+
+async def job_stats() -> dict:
+    counts = await asyncio.to_thread(job_store.counts)
+    return {"workers": len(_workers), **counts}
+
+
+async def _run_standalone() -> None:
+    await start_workers(settings.JOB_STANDALONE_WORKERS)
+    try:
+        await asyncio.gather(*_workers)
+    finally:
+        await stop_workers()
+
+
+if __name__ == "__main__":
+    # dedicated worker process, sized independently from the web tier
+    # (set ANALYSIS_WORKERS=0 on the api to leave all jobs to it)
+    asyncio.run(_run_standalone())
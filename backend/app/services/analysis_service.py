@@ -0,0 +1,63 @@
+# backend/app/services/analysis_service.py
+# glue between uploaded images, the analysis cache and the ai vision call
+
+import asyncio
+import hashlib
+from typing import Optional
+
+from app.core.cache import create_cache
+from app.core.config import settings
+from app.services.openai_service import analyze_food_image
+
+# cache of analysis results keyed by sha256 of the image content
+analysis_cache = create_cache(
+    "analysis",
+    settings.ANALYSIS_CACHE_BACKEND,
+    settings.ANALYSIS_CACHE_MAX_ENTRIES,
+    settings.ANALYSIS_CACHE_TTL_SECONDS,
+)
+
+
+def hash_file(path: str) -> str:
+    """Returns the sha256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def normalize_analysis(result: dict) -> dict:
+    """Fills defaults so cached entries always have the same shape."""
+    return {
+        "name": result.get("name", "Unknown Food"),
+        "calories": result.get("calories", 0),
+        "protein": result.get("protein", 0),
+        "fats": result.get("fats", 0),
+        "carbs": result.get("carbs", 0),
+        "weight_grams": result.get("weight_grams", 0),
+        "is_food": result.get("is_food", True) is not False,
+        "confidence": 1.0,
+    }
+
+
+async def analyze_image_cached(image_path: str, content_hash: Optional[str] = None) -> Optional[dict]:
+    """
+    Returns the normalized analysis for an image.
+    Identical images (same content hash) are answered from the cache.
+    """
+    if content_hash is None:
+        content_hash = await asyncio.to_thread(hash_file, image_path)
+
+    cached = await analysis_cache.get(content_hash)
+    if cached is not None:
+        print(f"⚡ [ANALYSIS_CACHE] Hit for {content_hash[:12]}")
+        return cached
+
+    result = await analyze_food_image(image_path, content_hash)
+    if not result:
+        return None
+
+    analysis = normalize_analysis(result)
+    await analysis_cache.set(content_hash, analysis)
+    return analysis
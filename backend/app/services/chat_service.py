@@ -0,0 +1,71 @@
+# backend/app/services/chat_service.py
+# response cache in front of the ai nutritionist for frequently asked questions
+
+from typing import Tuple
+
+from app.core.cache import create_cache
+from app.core.config import settings
+from app.services.openai_service import (
+    chat_with_nutritionist,
+    stream_chat_with_nutritionist,
+    normalize_chat_message,
+    is_fallback_reply,
+)
+
+# replies keyed by the normalized question
+chat_cache = create_cache(
+    "chat",
+    settings.CHAT_CACHE_BACKEND,
+    settings.CHAT_CACHE_MAX_ENTRIES,
+    settings.CHAT_CACHE_TTL_SECONDS,
+)
+
+
+async def get_chat_reply(message: str, use_cache: bool = True) -> Tuple[str, bool]:
+    """
+    Returns (reply, served_from_cache).
+    With use_cache=False the cache is neither read nor written.
+    """
+    key = normalize_chat_message(message)
+
+    if use_cache:
+        cached = await chat_cache.get(key)
+        if cached is not None:
+            print(f"⚡ [CHAT_CACHE] Hit for '{key[:50]}'")
+            return cached, True
+
+    reply, finish_reason = await chat_with_nutritionist(message)
+
+    # errors, fallbacks and truncated answers must not be served to the next user
+    if use_cache and reply and finish_reason == "stop" and not is_fallback_reply(reply):
+        await chat_cache.set(key, reply)
+
+    return reply, False
+
+
+async def stream_chat_reply(message: str, use_cache: bool = True):
+    """
+    Streaming variant: a cached reply is sent as one delta,
+    a fresh complete reply is stored once the stream has finished.
+    """
+    key = normalize_chat_message(message)
+
+    if use_cache:
+        cached = await chat_cache.get(key)
+        if cached is not None:
+            print(f"⚡ [CHAT_CACHE] Hit for '{key[:50]}'")
+            yield {"type": "delta", "content": cached}
+            yield {"type": "done", "finish_reason": "stop", "truncated": False, "cached": True}
+            return
+
+    parts = []
+    async for event in stream_chat_with_nutritionist(message):
+        if event["type"] == "delta":
+            parts.append(event["content"])
+        elif event["type"] == "done":
+            reply = "".join(parts)
+            # only complete answers are worth caching
+            if use_cache and event["finish_reason"] == "stop" and not is_fallback_reply(reply):
+                await chat_cache.set(key, reply)
+            event = {**event, "cached": False}
+        yield event
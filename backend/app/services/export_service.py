@@ -0,0 +1,61 @@
+# backend/app/services/export_service.py
+# streaming export of a user's whole meal history as csv or ndjson.
+# rows come from a server-side cursor in partitions, so memory stays flat
+# and the first bytes go out before the query is done.
+
+import csv
+import io
+import json
+from typing import AsyncIterator
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import select
+
+from app.db.session import ReadSessionLocal
+from app.models.meal import Meal
+
+# same names as the import columns, so an export can be imported again
+EXPORT_COLUMNS = [
+    "id", "name", "calories", "protein", "fats", "carbs",
+    "weight_grams", "image_url", "created_at",
+]
+PARTITION_SIZE = 1000
+
+
+def _csv_chunk(rows: list) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
+
+
+async def stream_meal_export(user_id: int, tz: ZoneInfo, fmt: str) -> AsyncIterator[str]:
+    """
+    Yields the export in chunks of PARTITION_SIZE rows.
+    Opens its own session: request dependencies are closed before a streaming body is sent.
+    """
+    query = (
+        select(*(getattr(Meal, column) for column in EXPORT_COLUMNS))
+        .where(Meal.user_id == user_id)
+        .order_by(Meal.created_at, Meal.id)
+        .execution_options(yield_per=PARTITION_SIZE)
+    )
+
+    if fmt == "csv":
+        yield _csv_chunk([EXPORT_COLUMNS])
+
+    exported = 0
+    async with ReadSessionLocal() as db:
+        result = await db.stream(query)
+        async for partition in result.partitions():
+            rows = [
+                # timestamps in the user's zone, with the offset
+                (*row[:-1], row[-1].astimezone(tz).isoformat() if row[-1] else None)
+                for row in partition
+            ]
+            exported += len(rows)
+            if fmt == "csv":
+                yield _csv_chunk(rows)
+            else:
+                yield "".join(json.dumps(dict(zip(EXPORT_COLUMNS, row))) + "\n" for row in rows)
+
+    print(f"📤 [EXPORT] User {user_id}: {exported} meals exported as {fmt}")
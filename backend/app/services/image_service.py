@@ -0,0 +1,150 @@
+# backend/app/services/image_service.py
+# preparing uploaded photos for the vision model:
+# downscale, re-encode to a compact format and strip exif, off the event loop.
+# also renders the small webp variants the apps show in lists
+
+import asyncio
+import base64
+import io
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from app.core.config import settings
+
+# dedicated pool so heavy decoding never competes with the default executor
+_executor = ThreadPoolExecutor(
+    max_workers=settings.IMAGE_PROCESSING_WORKERS,
+    thread_name_prefix="image-prep",
+)
+
+MIME_TYPES = {"JPEG": "image/jpeg", "WEBP": "image/webp", "PNG": "image/png"}
+
+# running totals, exposed on /metrics
+image_stats = {
+    "processed": 0,
+    "failed": 0,
+    "bytes_in": 0,
+    "bytes_out": 0,
+    "seconds_total": 0.0,
+    "variants_rendered": 0,
+}
+
+
+def _reencode(path: str) -> bytes:
+    """Decodes the image, applies exif rotation, downsizes and re-encodes it."""
+    output_format = settings.IMAGE_OUTPUT_FORMAT.upper()
+    max_side = settings.IMAGE_MAX_DIMENSION
+
+    with Image.open(path) as img:
+        # phones store rotation in exif, apply it before exif is dropped
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail((max_side, max_side), Image.LANCZOS)
+
+        if output_format == "JPEG" and img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+
+        buffer = io.BytesIO()
+        # no exif/icc is passed to save(), so metadata is stripped
+        img.save(buffer, format=output_format, quality=settings.IMAGE_QUALITY, optimize=True)
+        return buffer.getvalue()
+
+
+def _prepare_sync(path: str) -> Tuple[str, str, dict]:
+    started = time.perf_counter()
+    bytes_in = os.path.getsize(path)
+
+    try:
+        data = _reencode(path)
+        mime_type = MIME_TYPES.get(settings.IMAGE_OUTPUT_FORMAT.upper(), "image/jpeg")
+    except (UnidentifiedImageError, OSError) as e:
+        # formats pillow can't decode (e.g. heic) are sent as they are
+        print(f"⚠️ [IMAGE_PREP] Could not re-encode {path}: {e}. Sending original.")
+        with open(path, "rb") as f:
+            data = f.read()
+        mime_type = "image/jpeg"
+        image_stats["failed"] += 1
+
+    encoded = base64.b64encode(data).decode("utf-8")
+    stats = {
+        "bytes_in": bytes_in,
+        "bytes_out": len(data),
+        "seconds": round(time.perf_counter() - started, 4),
+    }
+    return encoded, mime_type, stats
+
+
+def _read_original(path: str) -> Tuple[str, str, dict]:
+    started = time.perf_counter()
+    with open(path, "rb") as f:
+        data = f.read()
+    stats = {
+        "bytes_in": len(data),
+        "bytes_out": len(data),
+        "seconds": round(time.perf_counter() - started, 4),
+    }
+    return base64.b64encode(data).decode("utf-8"), "image/jpeg", stats
+
+
+async def prepare_image_for_ai(path: str) -> Optional[Tuple[str, str]]:
+    """
+    Returns (base64 data, mime type) of the image ready for the vision call,
+    or None if the file can't be read.
+    """
+    loop = asyncio.get_running_loop()
+
+    try:
+        if settings.IMAGE_PREPROCESS_ENABLED:
+            encoded, mime_type, stats = await loop.run_in_executor(_executor, _prepare_sync, path)
+        else:
+            encoded, mime_type, stats = await loop.run_in_executor(_executor, _read_original, path)
+    except Exception as e:
+        print(f"❌ [IMAGE_PREP_ERROR] Could not read file: {e}")
+        return None
+
+    image_stats["processed"] += 1
+    image_stats["bytes_in"] += stats["bytes_in"]
+    image_stats["bytes_out"] += stats["bytes_out"]
+    image_stats["seconds_total"] += stats["seconds"]
+
+    print(
+        f"🖼️ [IMAGE_PREP] {stats['bytes_in']} -> {stats['bytes_out']} bytes "
+        f"in {stats['seconds']:.3f}s"
+    )
+    return encoded, mime_type
+
+
+
+def _render_variants_sync(source: str, targets: List[Tuple[int, str]]) -> None:
+    """Writes a webp copy per (longest side, path), largest first, each one downscaled from the last."""
+    with Image.open(source) as img:
+        # jpeg only: decode at a reduced scale that is still >= the largest variant, much faster
+        largest = max(size for size, _ in targets)
+        img.draft("RGB", (largest, largest))
+        img = ImageOps.exif_transpose(img)
+        img = img.convert("RGBA" if img.mode in ("RGBA", "LA", "P") else "RGB")
+        for size, path in sorted(targets, reverse=True):
+            img.thumbnail((size, size), Image.LANCZOS)
+            img.save(path, format="WEBP", quality=settings.IMAGE_VARIANT_QUALITY, method=4)
+
+
+async def render_variants(source: str, targets: List[Tuple[int, str]]) -> bool:
+    """
+    Renders the variants off the event loop. False if that fails for any reason,
+    variants are optional and must never fail the upload.
+    """
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    try:
+        await loop.run_in_executor(_executor, _render_variants_sync, source, targets)
+    except Exception as e:
+        # e.g. heic without a decoder or a decompression bomb, the media mount redirects to the original
+        print(f"⚠️ [IMAGE_VARIANTS] Could not render {source}: {e}")
+        return False
+
+    image_stats["variants_rendered"] += len(targets)
+    print(f"🖼️ [IMAGE_VARIANTS] {len(targets)} variants in {time.perf_counter() - started:.3f}s")
+    return True
@@ -0,0 +1,180 @@
+# backend/app/services/import_service.py
+# bulk meal import (history from other trackers) from csv or ndjson uploads.
+# the file is read row by row, validated in batches off the event loop
+# and loaded with asyncpg COPY. invalid rows are skipped and reported.
+# the caller commits, so an import is all-or-nothing on database errors.
+
+import asyncio
+import csv
+import io
+import itertools
+import json
+from datetime import date, datetime, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from fastapi import UploadFile
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.timezones import local_day
+from app.schemas.meal import MealImportRow
+from app.services.rollup_service import add_day_totals
+from app.services.storage_service import adjust_refs, count_refs, normalize_image_url
+from app.services.sync_service import bump_version
+
+FORMATS = ("csv", "ndjson")
+COPY_COLUMNS = [
+    "user_id", "name", "calories", "protein", "fats", "carbs",
+    "weight_grams", "image_url", "created_at", "version",
+]
+MAX_REPORTED_ERRORS = 100
+
+
+class ImportRejected(Exception):
+    """The file as a whole can't be imported (format, encoding, header, size)."""
+
+
+def detect_format(file: UploadFile, requested: Optional[str] = None) -> str:
+    if requested:
+        if requested not in FORMATS:
+            raise ImportRejected(f"Unknown format '{requested}', use csv or ndjson")
+        return requested
+    name = (file.filename or "").lower()
+    content_type = (file.content_type or "").lower()
+    if name.endswith(".csv") or "csv" in content_type:
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl")) or "ndjson" in content_type or "jsonl" in content_type:
+        return "ndjson"
+    raise ImportRejected("Unknown file format, pass format=csv or format=ndjson")
+
+
+def _raw_rows(text: io.TextIOBase, fmt: str) -> Iterator[Tuple[int, object]]:
+    """Yields (row number, dict) or (row number, error message)."""
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        if reader.fieldnames is None:
+            return
+        missing = {"name", "calories"} - set(reader.fieldnames)
+        if missing:
+            raise ImportRejected(f"CSV header is missing: {', '.join(sorted(missing))}")
+        for number, row in enumerate(reader, start=1):
+            # empty cells fall back to the schema defaults
+            yield number, {key: value for key, value in row.items() if key and value not in (None, "")}
+        return
+
+    for number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            value = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield number, f"invalid JSON: {e.msg}"
+            continue
+        if not isinstance(value, dict):
+            yield number, "expected a JSON object"
+            continue
+        yield number, value
+
+
+def _describe(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}" for item in error.errors()
+    )
+
+
+def _next_batch(
+    rows: Iterator, user_id: int, tz: ZoneInfo, now: datetime, version: int
+) -> Tuple[int, list, list]:
+    """Validates up to IMPORT_BATCH_SIZE rows. Returns (rows read, copy records, errors)."""
+    records, errors = [], []
+    read = 0
+    try:
+        for number, raw in itertools.islice(rows, settings.IMPORT_BATCH_SIZE):
+            read += 1
+            if isinstance(raw, str):
+                errors.append({"row": number, "error": raw})
+                continue
+            try:
+                item = MealImportRow.model_validate(raw)
+            except ValidationError as e:
+                errors.append({"row": number, "error": _describe(e)})
+                continue
+
+            created_at = item.created_at or now
+            if created_at.tzinfo is None:
+                created_at = created_at.replace(tzinfo=tz)
+            records.append((
+                user_id, item.name, item.calories, item.protein, item.fats, item.carbs,
+                item.weight_grams, normalize_image_url(item.image_url), created_at, version,
+            ))
+    except UnicodeDecodeError:
+        raise ImportRejected("The file must be UTF-8 encoded")
+    except csv.Error as e:
+        raise ImportRejected(f"Malformed CSV: {e}")
+    return read, records, errors
+
+
+def _day_totals(records: list, tz: ZoneInfo) -> Dict[date, dict]:
+    per_day: Dict[date, dict] = {}
+    for _, _, calories, protein, fats, carbs, _, _, created_at, _ in records:
+        day = per_day.setdefault(
+            local_day(created_at, tz),
+            {"calories": 0, "protein": 0.0, "fats": 0.0, "carbs": 0.0, "meal_count": 0},
+        )
+        day["calories"] += calories
+        day["protein"] += protein
+        day["fats"] += fats
+        day["carbs"] += carbs
+        day["meal_count"] += 1
+    return per_day
+
+
+async def import_meals(db: AsyncSession, user_id: int, file: UploadFile, fmt: str) -> dict:
+    """Imports all valid rows of the upload into the caller's transaction."""
+    # the upload is already spooled to a temp file, read it as text without loading it whole
+    text = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    rows = _raw_rows(text, fmt)
+    now = datetime.now(timezone.utc)
+
+    # one sync version for the whole import (this also opens the transaction the COPY joins)
+    version, tz = await bump_version(db, user_id)
+    connection = await db.connection()
+    driver = (await connection.get_raw_connection()).driver_connection
+
+    imported, total_read = 0, 0
+    errors: List[dict] = []
+    failed = 0
+    try:
+        while True:
+            read, records, batch_errors = await asyncio.to_thread(
+                _next_batch, rows, user_id, tz, now, version
+            )
+            total_read += read
+            if total_read > settings.IMPORT_MAX_ROWS:
+                raise ImportRejected(f"Too many rows, the limit is {settings.IMPORT_MAX_ROWS} per file")
+
+            failed += len(batch_errors)
+            errors.extend(batch_errors[:MAX_REPORTED_ERRORS - len(errors)])
+
+            if records:
+                await add_day_totals(db, user_id, _day_totals(records, tz))
+                # re-imported exports may point at stored images
+                await adjust_refs(db, count_refs(record[7] for record in records))
+                await driver.copy_records_to_table("meals", records=records, columns=COPY_COLUMNS)
+                imported += len(records)
+
+            if read < settings.IMPORT_BATCH_SIZE:
+                break
+    finally:
+        # don't let the wrapper close the upload's file
+        text.detach()
+
+    print(f"📥 [IMPORT] User {user_id}: {imported} meals imported, {failed} rows rejected")
+    return {
+        "imported": imported,
+        "failed": failed,
+        "errors": errors,
+        "errors_truncated": failed > len(errors),
+    }
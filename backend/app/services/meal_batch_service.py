@@ -0,0 +1,181 @@
+# backend/app/services/meal_batch_service.py
+# batched create/update/delete of meals in one transaction (offline queue of the ios app).
+# every operation carries an idempotency key. keys and their results are stored per user,
+# so a replayed key gets the stored result back instead of being applied twice.
+
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.timezones import local_day
+from app.models.idempotency_key import IdempotencyKey
+from app.models.meal import Meal
+from app.schemas.meal import Meal as MealSchema, MealBatchOperation
+from app.services.rollup_service import add_day_totals
+from app.services.storage_service import adjust_refs, count_refs, normalize_image_url
+from app.services.sync_service import bump_version, record_tombstones
+
+
+def _snapshot(meal: Meal) -> dict:
+    # image_variants is derived from image_url when the response is built
+    return MealSchema.model_validate(meal).model_dump(mode="json", exclude={"image_variants"})
+
+
+def _add_to_days(per_day: Dict[date, dict], meal: Meal, tz: ZoneInfo, sign: int) -> None:
+    day = per_day.setdefault(
+        local_day(meal.created_at, tz),
+        {"calories": 0, "protein": 0.0, "fats": 0.0, "carbs": 0.0, "meal_count": 0},
+    )
+    day["calories"] += sign * (meal.calories or 0)
+    day["protein"] += sign * (meal.protein or 0.0)
+    day["fats"] += sign * (meal.fats or 0.0)
+    day["carbs"] += sign * (meal.carbs or 0.0)
+    day["meal_count"] += sign
+
+
+async def _claim_keys(db: AsyncSession, user_id: int, keys: List[str]) -> set:
+    """
+    Inserts the keys and returns the ones this transaction owns.
+    The caller holds the user row, so no other batch of this user is claiming keys
+    at the same time and a replayed key is always either new or committed.
+    """
+    result = await db.execute(
+        pg_insert(IdempotencyKey)
+        .values([{"user_id": user_id, "key": key} for key in keys])
+        .on_conflict_do_nothing()
+        .returning(IdempotencyKey.key)
+    )
+    return set(result.scalars().all())
+
+
+async def apply_meal_batch(db: AsyncSession, user_id: int, operations: List[MealBatchOperation]) -> List[dict]:
+    """Applies the operations in order. Returns one result dict per operation, the caller commits."""
+    now = datetime.now(timezone.utc)
+
+    # one sync version for everything this batch changes, and the user's timezone as stored.
+    # user row first, then keys and meals: batches of one user run one at a time, so two
+    # replays with the same keys in a different order can't deadlock on the key rows
+    version, tz = await bump_version(db, user_id)
+
+    # old keys expire, the table only has to cover realistic retry windows
+    await db.execute(
+        delete(IdempotencyKey).where(
+            IdempotencyKey.user_id == user_id,
+            IdempotencyKey.created_at < now - timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS),
+        )
+    )
+
+    keys = list(dict.fromkeys(op.idempotency_key for op in operations))
+    claimed = await _claim_keys(db, user_id, keys)
+    stored = {}
+    if len(claimed) < len(keys):
+        result = await db.execute(
+            select(IdempotencyKey.key, IdempotencyKey.result).where(
+                IdempotencyKey.user_id == user_id,
+                IdempotencyKey.key.in_(set(keys) - claimed),
+            )
+        )
+        stored = dict(result.all())
+
+    # every meal touched by an update/delete, in one query, locked until commit
+    meal_ids = {op.meal_id for op in operations if op.op != "create" and op.idempotency_key in claimed}
+    meals: Dict[int, Meal] = {}
+    if meal_ids:
+        result = await db.execute(
+            select(Meal)
+            .where(Meal.user_id == user_id, Meal.id.in_(meal_ids))
+            .order_by(Meal.id)
+            .with_for_update()
+        )
+        meals = {meal.id: meal for meal in result.scalars().all()}
+
+    deleted_ids: List[int] = []
+
+    per_day: Dict[date, dict] = {}
+    refs = Counter()                # image references gained/lost
+    outcomes: Dict[str, dict] = {}  # key -> result applied in this batch
+    created: Dict[str, Meal] = {}   # key -> new meal, snapshot after the flush
+    results: List[dict] = []
+
+    for index, op in enumerate(operations):
+        key = op.idempotency_key
+        item = {"index": index, "idempotency_key": key, "op": op.op}
+
+        # seen before (earlier request or earlier in this batch): report, don't apply
+        if key not in claimed or key in outcomes:
+            previous = outcomes.get(key) or stored.get(key)
+            if previous is None:
+                previous = {"status_code": 409, "meal": None, "error": "Operation is still in progress"}
+            results.append({**item, "status": "replayed", **previous})
+            continue
+
+        if op.op == "create":
+            data = op.meal.model_dump()
+            created_at = data.pop("created_at") or now
+            if created_at.tzinfo is None:
+                created_at = created_at.replace(tzinfo=tz)
+            meal = Meal(**data, user_id=user_id, created_at=created_at, version=version)
+            meal.image_url = normalize_image_url(meal.image_url)
+            db.add(meal)
+            _add_to_days(per_day, meal, tz, 1)
+            refs.update(count_refs([meal.image_url]))
+            created[key] = meal
+            outcome = {"status_code": 201, "meal": None, "error": None}
+
+        else:
+            meal = meals.get(op.meal_id)
+            if meal is None:
+                outcome = {"status_code": 404, "meal": None, "error": "Meal not found"}
+            elif op.op == "update":
+                _add_to_days(per_day, meal, tz, -1)
+                refs.update(count_refs([meal.image_url], -1))
+                for field, value in op.changes.model_dump(exclude_unset=True).items():
+                    setattr(meal, field, value)
+                meal.image_url = normalize_image_url(meal.image_url)
+                meal.version = version
+                _add_to_days(per_day, meal, tz, 1)
+                refs.update(count_refs([meal.image_url]))
+                outcome = {"status_code": 200, "meal": _snapshot(meal), "error": None}
+            else:
+                _add_to_days(per_day, meal, tz, -1)
+                refs.update(count_refs([meal.image_url], -1))
+                await db.delete(meal)
+                del meals[op.meal_id]
+                deleted_ids.append(op.meal_id)
+                outcome = {"status_code": 200, "meal": None, "error": None}
+
+        outcomes[key] = outcome
+        results.append({**item, "status": "applied" if outcome["status_code"] < 400 else "failed", **outcome})
+
+    # one flush: multi-row insert (ids come back), updates and deletes
+    await db.flush()
+    for key, meal in created.items():
+        outcomes[key]["meal"] = _snapshot(meal)
+    for result in results:
+        if result["idempotency_key"] in created:
+            result["meal"] = outcomes[result["idempotency_key"]]["meal"]
+
+    await add_day_totals(db, user_id, per_day)
+    await adjust_refs(db, refs)
+    await record_tombstones(db, user_id, deleted_ids, version)
+
+    # remember applied results, forget failed keys so the client can retry them
+    succeeded = [key for key, outcome in outcomes.items() if outcome["status_code"] < 400]
+    failed = [key for key, outcome in outcomes.items() if outcome["status_code"] >= 400]
+    if succeeded:
+        await db.execute(
+            update(IdempotencyKey),
+            [{"user_id": user_id, "key": key, "result": outcomes[key]} for key in succeeded],
+        )
+    if failed:
+        await db.execute(
+            delete(IdempotencyKey).where(IdempotencyKey.user_id == user_id, IdempotencyKey.key.in_(failed))
+        )
+
+    return results
@@ -1,104 +1,157 @@
-import base64
-import json
-import os
 import asyncio
-from openai import AsyncOpenAI
+import json
+import string
+from typing import Awaitable, Callable, Dict, Optional
 from app.core.config import settings
+from app.services.image_service import prepare_image_for_ai
+from app.services.ai_providers import create_provider
+from app.services.resilience import AIServiceError, CircuitBreaker, ResilientCaller
+
+# the configured ai backend (real openai or the local fake)
+provider = create_provider()
 
-# Initialize OpenAI client with a 60-second timeout
-client = AsyncOpenAI(
-    api_key=settings.OPENAI_API_KEY,
-    timeout=60.0 
+# retries, circuit breaker, global concurrency cap and hedging for every upstream call
+ai_caller = ResilientCaller(
+    provider.name,
+    max_concurrency=settings.AI_MAX_CONCURRENCY,
+    max_retries=settings.AI_MAX_RETRIES,
+    retry_base_delay=settings.AI_RETRY_BASE_DELAY_SECONDS,
+    retry_max_delay=settings.AI_RETRY_MAX_DELAY_SECONDS,
+    breaker=CircuitBreaker(
+        failure_threshold=settings.AI_BREAKER_FAILURE_THRESHOLD,
+        reset_seconds=settings.AI_BREAKER_RESET_SECONDS,
+    ),
+    hedge_after_seconds=settings.AI_HEDGE_AFTER_SECONDS,
 )
 
-def encode_image(image_path):
-    """Encodes a local image file to a base64 string."""
-    try:
-        with open(image_path, "rb") as image_file:
-            return base64.b64encode(image_file.read()).decode('utf-8')
-    except Exception as e:
-        print(f"❌ [ENCODER_ERROR] Could not read file: {e}")
-        return None
+class SingleFlight:
+    """
+    Request coalescing: concurrent calls with the same key share one upstream call.
+    The shared call runs as its own task, so a disconnecting caller doesn't cancel it for the others.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.calls = 0
+        self.upstream_calls = 0
+        self.coalesced = 0  # duplicate calls = upstream calls saved
+
+    async def do(self, key: str, fn: Callable[[], Awaitable]):
+        self.calls += 1
+        task = self._inflight.get(key)
+
+        if task is None:
+            self.upstream_calls += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+            print(f"🔗 [{self.name.upper()}_SINGLEFLIGHT] Joined in-flight call")
+
+        return await asyncio.shield(task)
 
-async def analyze_food_image(image_path: str):
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "upstream_calls": self.upstream_calls,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight),
+        }
+
+
+analysis_flight = SingleFlight("analysis")
+chat_flight = SingleFlight("chat")
+
+
+def normalize_chat_message(message: str) -> str:
+    """Case, whitespace and trailing punctuation don't change the question."""
+    collapsed = " ".join(message.casefold().split())
+    return collapsed.strip(string.punctuation + " ")
+
+
+async def analyze_food_image(image_path: str, content_hash: Optional[str] = None):
     """
-    Analyzes a food image using 'gpt-5-mini'.
+    Analyzes a food image. Concurrent calls for the same image content
+    (same hash) share one upstream request.
+    """
+    if content_hash is None:
+        return await _analyze_food_image(image_path)
+    return await analysis_flight.do(content_hash, lambda: _analyze_food_image(image_path))
+
+
+async def _analyze_food_image(image_path: str):
+    """
+    Analyzes a food image with the configured provider.
     Increased token limit to prevent cut-off during analysis.
     """
-    base64_image = encode_image(image_path)
-    if not base64_image:
+    # downscaled, exif-free copy of the photo (runs in a thread pool)
+    prepared = await prepare_image_for_ai(image_path)
+    if not prepared:
         return None
+    base64_image, mime_type = prepared
 
-    print(f"🚀 [AI_VISION] Sending image analysis request to gpt-5-mini...")
+    print(f"🚀 [AI_VISION] Sending image analysis request to {provider.name}...")
 
     try:
-        response = await client.chat.completions.create(
-            model="gpt-5-mini",
-            messages=[
-                {
-                    "role": "system",
-                    "content": """
-                    You are a professional nutritionist. Look at the image and provide: 
-                    1. Food name. 2. Calories. 3. Protein. 4. Fats. 5. Carbs. 6. Estimated weight. 
-                    Return ONLY valid JSON. keys: name, calories, protein, fats, carbs, weight_grams, is_food.
-                    If it's not food, set 'is_food': false.
-                    """
-                },
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "text", "text": "Analyze this meal in detail."},
-                        {
-                            "type": "image_url",
-                            "image_url": {"url": f"data:image/jpeg;base64,{base64_image}"}
-                        }
-                    ],
-                }
-            ],
-            # INCREASED: Giving more room for vision analysis
-            extra_body={"max_completion_tokens": 2000}, 
-            response_format={"type": "json_object"}
+        content = await ai_caller.call(
+            lambda: provider.analyze_image(base64_image, mime_type), hedge=True
         )
-
-        content = response.choices[0].message.content
         return json.loads(content)
 
+    except AIServiceError:
+        # upstream down/unhealthy: let the caller answer with 503
+        raise
     except Exception as e:
         print(f"❌ [AI_VISION_ERROR] API call failed: {str(e)}")
         return None
 
+CHAT_SYSTEM_PROMPT = (
+    "You are 'SmartCalorie AI', a helpful and expert nutritionist. "
+    "Keep your advice short, encouraging, and specific."
+)
+LENGTH_FALLBACK = "I was thinking too hard and ran out of space. Please try again."
+EMPTY_FALLBACK = "I am thinking, but I couldn't generate a text response. Please ask again."
+
+def is_fallback_reply(reply: str) -> bool:
+    """True for the canned/error replies that are not real answers."""
+    return (
+        reply in (LENGTH_FALLBACK, EMPTY_FALLBACK)
+        or reply.startswith("Service Error:")
+        or reply.startswith("System Error:")
+    )
+
+def _chat_messages(message: str) -> list:
+    return [
+        {"role": "system", "content": CHAT_SYSTEM_PROMPT},
+        {"role": "user", "content": message}
+    ]
+
 async def chat_with_nutritionist(message: str):
     """
-    Chat with the AI nutritionist using 'gpt-5-mini'.
+    Chat with the AI nutritionist, returns (reply, finish_reason). Identical questions
+    that are in flight at the same time share one upstream request.
+    """
+    key = normalize_chat_message(message)
+    return await chat_flight.do(key, lambda: _chat_with_nutritionist(message))
+
+async def _chat_with_nutritionist(message: str):
+    """
+    Chat with the AI nutritionist using the configured provider.
     Drastically increased token limit to solve 'Finish Reason: length'.
     """
     print(f"💬 [AI_CHAT] Processing request: {message[:50]}...")
     
-    if not settings.OPENAI_API_KEY:
-        return "System Error: No OpenAI API Key found."
+    # finish_reason is None for errors and fallbacks, so callers never cache them
+    if provider.name == "openai" and not settings.OPENAI_API_KEY:
+        return "System Error: No OpenAI API Key found.", None
 
     try:
-        response = await client.chat.completions.create(
-            model="gpt-5-mini",
-            messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "You are 'SmartCalorie AI', a helpful and expert nutritionist. "
-                        "Keep your advice short, encouraging, and specific."
-                    )
-                },
-                {"role": "user", "content": message}
-            ],
-            # INCREASED: From 1500 to 5000. 
-            # Reasoning models consume tokens for thinking before outputting text.
-            extra_body={"max_completion_tokens": 5000}
+        content, finish_reason = await ai_caller.call(
+            lambda: provider.complete_chat(_chat_messages(message)), hedge=True
         )
 
-        choice = response.choices[0]
-        content = choice.message.content
-        finish_reason = choice.finish_reason
-
         print(f"📡 [AI_DEBUG] Finish Reason: {finish_reason}")
 
         if content is None or content.strip() == "":
@@ -107,12 +160,68 @@ async def chat_with_nutritionist(message: str):
             # Diagnostic message for logs
             if finish_reason == "length":
                 print("❌ ERROR: Token limit reached during reasoning.")
-                return "I was thinking too hard and ran out of space. Please try again."
+                return LENGTH_FALLBACK, None
                 
-            return "I am thinking, but I couldn't generate a text response. Please ask again."
+            return EMPTY_FALLBACK, None
             
-        return content
+        return content, finish_reason
 
+    except AIServiceError:
+        # upstream down/unhealthy (or circuit open): the endpoint answers with 503
+        raise
     except Exception as e:
         print(f"❌ [AI_CHAT_ERROR] Exception: {str(e)}")
-        return f"Service Error: {str(e)}"
\ No newline at end of file
+        return f"Service Error: {str(e)}", None
+
+async def stream_chat_with_nutritionist(message: str):
+    """
+    Streaming variant of chat_with_nutritionist.
+    Yields events as dicts: {"type": "delta", "content": ...} for every text piece,
+    then one {"type": "done", "finish_reason": ..., "truncated": ...}
+    or {"type": "error", "message": ...}. Raises AIServiceError if the upstream is unavailable.
+    """
+    print(f"💬 [AI_CHAT_STREAM] Processing request: {message[:50]}...")
+
+    if provider.name == "openai" and not settings.OPENAI_API_KEY:
+        yield {"type": "error", "message": "System Error: No OpenAI API Key found."}
+        return
+
+    received_text = False
+    finish_reason = None
+
+    try:
+        # only opening the stream is retried, a broken stream is reported as an error
+        stream = await ai_caller.call(
+            lambda: provider.open_chat_stream(_chat_messages(message))
+        )
+
+        async for content, chunk_finish_reason in stream:
+            if content:
+                received_text = True
+                yield {"type": "delta", "content": content}
+            if chunk_finish_reason:
+                finish_reason = chunk_finish_reason
+
+    except AIServiceError:
+        raise
+    except Exception as e:
+        print(f"❌ [AI_CHAT_STREAM_ERROR] Exception: {str(e)}")
+        yield {"type": "error", "message": f"Service Error: {str(e)}"}
+        return
+
+    print(f"📡 [AI_DEBUG] Stream Finish Reason: {finish_reason}")
+
+    # same fallbacks as the non-streaming chat when nothing was generated
+    if not received_text:
+        print(f"⚠️ [AI_WARNING] Stream ended without content.")
+        yield {
+            "type": "delta",
+            "content": LENGTH_FALLBACK if finish_reason == "length" else EMPTY_FALLBACK
+        }
+
+    yield {
+        "type": "done",
+        "finish_reason": finish_reason,
+        # text was cut off by the token limit
+        "truncated": received_text and finish_reason == "length"
+    }
@@ -0,0 +1,203 @@
+# backend/app/services/resilience.py
+# protecting the app from a slow or failing ai upstream:
+# jittered retries, a circuit breaker, a global concurrency cap and optional hedging
+
+import asyncio
+import random
+import time
+from typing import Awaitable, Callable
+
+import openai
+
+
+class AIServiceError(Exception):
+    """The upstream ai service failed after all retries."""
+
+
+class CircuitOpenError(AIServiceError):
+    """The circuit breaker is open, the call was rejected without trying."""
+
+
+class TransientUpstreamError(Exception):
+    """Generic retryable failure raised by non-openai providers."""
+
+
+def is_retryable(error: Exception) -> bool:
+    """Timeouts, connection problems, rate limits and 5xx are worth another try."""
+    if isinstance(error, (openai.APITimeoutError, openai.APIConnectionError, openai.RateLimitError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code >= 500
+    return isinstance(error, (asyncio.TimeoutError, TransientUpstreamError))
+
+
+class CircuitBreaker:
+    """
+    closed -> open after `failure_threshold` consecutive failures.
+    open -> half_open after `reset_seconds`, letting one probe call through.
+    half_open -> closed on success, back to open on failure.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        if self.state == "closed":
+            return True
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_seconds:
+            self.state = "half_open"
+        if self.state == "half_open" and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def release_probe(self) -> None:
+        """The probe ended without an answer (cancelled), let the next call probe instead."""
+        self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        self._probe_in_flight = False
+        if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+            if self.state != "open":
+                self.times_opened += 1
+                print(f"🔌 [CIRCUIT] Opened after {self.consecutive_failures} failures")
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+
+class ResilientCaller:
+    """Runs upstream calls through the concurrency cap, breaker, retries and hedging."""
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int,
+        max_retries: int,
+        retry_base_delay: float,
+        retry_max_delay: float,
+        breaker: CircuitBreaker,
+        hedge_after_seconds: float = 0.0,
+    ):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.breaker = breaker
+        self.hedge_after_seconds = hedge_after_seconds
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.counters = {
+            "calls": 0,
+            "successes": 0,
+            "failures": 0,
+            "retries": 0,
+            "rejected_open_circuit": 0,
+            "hedges_started": 0,
+            "hedges_won": 0,
+            "in_flight": 0,
+        }
+
+    async def call(self, fn: Callable[[], Awaitable], hedge: bool = False):
+        """
+        Calls `fn` (a factory for the upstream coroutine).
+        Raises CircuitOpenError while the upstream is unhealthy and
+        AIServiceError when retryable errors persist. Other errors pass through.
+        """
+        self.counters["calls"] += 1
+
+        for attempt in range(self.max_retries + 1):
+            if not self.breaker.allow():
+                self.counters["rejected_open_circuit"] += 1
+                raise CircuitOpenError(f"{self.name} is temporarily unavailable")
+            probing = self.breaker.state == "half_open"
+
+            try:
+                if hedge and self.hedge_after_seconds > 0:
+                    result = await self._hedged(fn)
+                else:
+                    result = await self._attempt(fn)
+            except Exception as e:
+                if not is_retryable(e):
+                    # the upstream answered, our request was the problem
+                    self.breaker.record_success()
+                    self.counters["failures"] += 1
+                    raise
+                self.breaker.record_failure()
+                if attempt == self.max_retries:
+                    self.counters["failures"] += 1
+                    raise AIServiceError(f"{self.name} failed: {e}") from e
+
+                # exponential backoff with full jitter
+                delay = random.uniform(0, min(self.retry_max_delay, self.retry_base_delay * 2 ** attempt))
+                self.counters["retries"] += 1
+                print(f"🔁 [{self.name.upper()}_RETRY] Attempt {attempt + 1} failed ({e}), retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                # cancelled (client went away, shutdown, lost hedge): no verdict on the upstream,
+                # but a half-open probe must not stay "in flight" forever
+                if probing:
+                    self.breaker.release_probe()
+                raise
+
+            self.breaker.record_success()
+            self.counters["successes"] += 1
+            return result
+
+    async def _attempt(self, fn: Callable[[], Awaitable]):
+        async with self._semaphore:
+            self.counters["in_flight"] += 1
+            try:
+                return await fn()
+            finally:
+                self.counters["in_flight"] -= 1
+
+    async def _hedged(self, fn: Callable[[], Awaitable]):
+        """Starts a second identical request if the first is slow, returns whichever wins."""
+        primary = asyncio.ensure_future(self._attempt(fn))
+        pending = {primary}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=self.hedge_after_seconds)
+            if done:
+                return primary.result()
+
+            self.counters["hedges_started"] += 1
+            backup = asyncio.ensure_future(self._attempt(fn))
+            pending = {primary, backup}
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is backup:
+                            self.counters["hedges_won"] += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            # the losing (or abandoned) request is cancelled
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            **self.counters,
+            "max_concurrency": self.max_concurrency,
+            "circuit": {
+                "state": self.breaker.state,
+                "consecutive_failures": self.breaker.consecutive_failures,
+                "times_opened": self.breaker.times_opened,
+            },
+        }
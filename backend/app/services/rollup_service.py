@@ -0,0 +1,137 @@
+# backend/app/services/rollup_service.py
+# keeps the daily_totals rollup in sync with meals, inside the caller's transaction.
+# rebuild for backfill/repair:
+#   python -m app.services.rollup_service              (all users)
+#   python -m app.services.rollup_service --user-id 7
+
+import argparse
+import asyncio
+from datetime import date
+from typing import Dict, List, Optional
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.daily_total import DailyTotal
+from app.models.meal import Meal
+from app.models.user import User
+from app.core.timezones import local_day
+
+
+async def _upsert(db: AsyncSession, rows: List[dict]) -> None:
+    # atomic increment: concurrent writes for the same day can't lose updates
+    stmt = pg_insert(DailyTotal).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DailyTotal.user_id, DailyTotal.day],
+        set_={
+            "calories": DailyTotal.calories + stmt.excluded.calories,
+            "protein": DailyTotal.protein + stmt.excluded.protein,
+            "fats": DailyTotal.fats + stmt.excluded.fats,
+            "carbs": DailyTotal.carbs + stmt.excluded.carbs,
+            "meal_count": DailyTotal.meal_count + stmt.excluded.meal_count,
+        },
+    )
+    await db.execute(stmt)
+
+
+async def _apply(db: AsyncSession, meal: Meal, tz: ZoneInfo, sign: int) -> None:
+    await _upsert(db, [{
+        "user_id": meal.user_id,
+        "day": local_day(meal.created_at, tz),
+        "calories": sign * (meal.calories or 0),
+        "protein": sign * (meal.protein or 0.0),
+        "fats": sign * (meal.fats or 0.0),
+        "carbs": sign * (meal.carbs or 0.0),
+        "meal_count": sign,
+    }])
+
+
+async def add_day_totals(db: AsyncSession, user_id: int, per_day: Dict[date, dict]) -> None:
+    """
+    Bulk version for imports and batches: {day: {"calories", "protein", "fats", "carbs", "meal_count"}}.
+    Amounts are deltas and may be negative.
+    """
+    rows = [{"user_id": user_id, "day": day, **amounts} for day, amounts in per_day.items()]
+    # chunks keep each statement well below the 32767 bind parameter limit
+    for i in range(0, len(rows), 1000):
+        await _upsert(db, rows[i:i + 1000])
+    if any(amounts["meal_count"] < 0 for amounts in per_day.values()):
+        await db.execute(
+            delete(DailyTotal).where(
+                DailyTotal.user_id == user_id,
+                DailyTotal.day.in_(list(per_day)),
+                DailyTotal.meal_count <= 0,
+            )
+        )
+
+
+async def add_meal_to_totals(db: AsyncSession, meal: Meal, tz: ZoneInfo) -> None:
+    """Call after the meal is flushed (created_at must be loaded). tz is the owner's zone."""
+    await _apply(db, meal, tz, 1)
+
+
+async def remove_meal_from_totals(db: AsyncSession, meal: Meal, tz: ZoneInfo) -> None:
+    """Call with the meal's values as they are stored before an update/delete."""
+    await _apply(db, meal, tz, -1)
+    # days without meals don't need a row
+    await db.execute(
+        delete(DailyTotal).where(
+            DailyTotal.user_id == meal.user_id,
+            DailyTotal.day == local_day(meal.created_at, tz),
+            DailyTotal.meal_count <= 0,
+        )
+    )
+
+
+async def rebuild_daily_totals(db: AsyncSession, user_id: Optional[int] = None) -> None:
+    """
+    Recomputes the rollup from the meals table (all users or one).
+    Also needed after a user changes their timezone, days are local to the user.
+    """
+    day = func.date(func.timezone(User.timezone, Meal.created_at))
+
+    clear = delete(DailyTotal)
+    source = (
+        select(
+            Meal.user_id,
+            day,
+            func.coalesce(func.sum(Meal.calories), 0),
+            func.coalesce(func.sum(Meal.protein), 0.0),
+            func.coalesce(func.sum(Meal.fats), 0.0),
+            func.coalesce(func.sum(Meal.carbs), 0.0),
+            func.count(Meal.id),
+        )
+        .join(User, User.id == Meal.user_id)
+        .group_by(Meal.user_id, day)
+    )
+    if user_id is not None:
+        clear = clear.where(DailyTotal.user_id == user_id)
+        source = source.where(Meal.user_id == user_id)
+
+    # pending changes (e.g. a new user timezone) must be visible to the insert below
+    await db.flush()
+    await db.execute(clear)
+    await db.execute(
+        pg_insert(DailyTotal).from_select(
+            ["user_id", "day", "calories", "protein", "fats", "carbs", "meal_count"],
+            source,
+        )
+    )
+
+
+async def _main(user_id: Optional[int]) -> None:
+    from app.db.session import SessionLocal, engine
+
+    async with SessionLocal() as db:
+        await rebuild_daily_totals(db, user_id)
+        await db.commit()
+    await engine.dispose()
+    print(f"✅ [ROLLUP] Rebuilt daily totals for {'user ' + str(user_id) if user_id else 'all users'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the daily_totals rollup from meals")
+    parser.add_argument("--user-id", type=int, default=None)
+    asyncio.run(_main(parser.parse_args().user_id))
@@ -0,0 +1,87 @@
+# backend/app/services/stats_service.py
+# range statistics for the charts, computed from the daily_totals rollup.
+# buckets come from generate_series, so empty days/weeks/months are filled by the db
+# and the response size only depends on the range, never on how many meals were logged.
+
+from datetime import date
+from typing import List
+
+from sqlalchemy import Date, DateTime, Interval, cast, func, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.daily_total import DailyTotal
+
+BUCKETS = ("day", "week", "month")
+
+
+async def range_stats(
+    db: AsyncSession, user_id: int, start: date, end: date, bucket: str = "day"
+) -> List[dict]:
+    """
+    Totals per bucket between start and end (both inclusive).
+    Weeks start on monday and months on the 1st, so the first and last bucket
+    can be partial - they only count days inside the range.
+    """
+    if bucket not in BUCKETS:
+        raise ValueError(f"Unknown bucket: {bucket}")
+
+    # plain timestamps, so date_trunc doesn't depend on the session time zone
+    def truncate(value):
+        return cast(func.date_trunc(bucket, cast(value, DateTime)), Date)
+
+    buckets = select(
+        cast(
+            func.generate_series(
+                func.date_trunc(bucket, cast(start, DateTime)),
+                func.date_trunc(bucket, cast(end, DateTime)),
+                cast(literal(f"1 {bucket}"), Interval),
+            ),
+            Date,
+        ).label("bucket_start")
+    ).subquery("buckets")
+
+    days = (
+        select(
+            truncate(DailyTotal.day).label("bucket_start"),
+            DailyTotal.calories,
+            DailyTotal.protein,
+            DailyTotal.fats,
+            DailyTotal.carbs,
+            DailyTotal.meal_count,
+        )
+        .where(
+            DailyTotal.user_id == user_id,
+            DailyTotal.day >= start,
+            DailyTotal.day <= end,
+        )
+        .subquery("days")
+    )
+
+    query = (
+        select(
+            buckets.c.bucket_start,
+            func.coalesce(func.sum(days.c.calories), 0),
+            func.coalesce(func.sum(days.c.protein), 0.0),
+            func.coalesce(func.sum(days.c.fats), 0.0),
+            func.coalesce(func.sum(days.c.carbs), 0.0),
+            func.coalesce(func.sum(days.c.meal_count), 0),
+            func.count(days.c.bucket_start),
+        )
+        .select_from(buckets.outerjoin(days, days.c.bucket_start == buckets.c.bucket_start))
+        .group_by(buckets.c.bucket_start)
+        .order_by(buckets.c.bucket_start)
+    )
+    result = await db.execute(query)
+
+    return [
+        {
+            "date": bucket_start,
+            "total_calories": int(calories),
+            "total_protein": round(protein, 1),
+            "total_fats": round(fats, 1),
+            "total_carbs": round(carbs, 1),
+            "meal_count": int(meal_count),
+            "days_logged": days_logged,
+        }
+        for bucket_start, calories, protein, fats, carbs, meal_count, days_logged in result.all()
+    ]
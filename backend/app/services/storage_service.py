@@ -0,0 +1,190 @@
+# backend/app/services/storage_service.py
+# dedup and reference counting on top of app/core/storage.py.
+# every upload is registered in stored_images, meals count as references (their image_url).
+# blobs without references (failed analyses, deleted meals) are removed by the sweep:
+#   python -m app.services.storage_service --sweep
+#   python -m app.services.storage_service --recount   (repair refcounts from meals)
+#   python -m app.services.storage_service --variants  (render missing size variants)
+
+import argparse
+import asyncio
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.storage import content_key, storage, variant_key
+from app.db.session import SessionLocal
+from app.models.meal import Meal
+from app.models.stored_image import StoredImage
+from app.models.user import User  # noqa: F401  (Meal.owner needs it when run as a script)
+from app.services.image_service import render_variants
+
+
+async def store_blob(staged_path: str, sha256: str, extension: str, size: int) -> str:
+    """Moves a staged upload into storage (once per content) and returns its key."""
+    key = content_key(sha256, extension)
+    # register first: a fresh updated_at keeps the sweep away from this blob
+    async with SessionLocal() as db:
+        stmt = pg_insert(StoredImage).values(key=key, size=size)
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=[StoredImage.key],
+            set_={"size": stmt.excluded.size, "updated_at": func.now()},
+        ))
+        await db.commit()
+
+    if not await storage.put(key, staged_path):
+        print(f"♻️ [STORAGE] Dedup hit for {key}")
+    return key
+
+
+async def ensure_variants(key: str) -> None:
+    """Renders the size variants of a stored blob that don't exist yet."""
+    sizes = sorted(set(settings.IMAGE_VARIANTS.values()))
+    missing = [size for size in sizes if not await storage.exists(variant_key(key, size))]
+    source = storage.local_path(key)
+    if not missing or source is None:
+        return
+
+    targets = [(size, storage.staging_path()) for size in missing]
+    try:
+        if await render_variants(source, targets):
+            for size, staged in targets:
+                await storage.put(variant_key(key, size), staged)
+    finally:
+        for _, staged in targets:
+            await storage.discard(staged)
+
+
+def normalize_image_url(url: Optional[str]) -> Optional[str]:
+    """Urls of stored blobs are saved in their canonical form, anything else as is."""
+    key = storage.key_from_url(url)
+    return storage.url(key) if key else url
+
+
+def public_image_url(url: Optional[str], base_url: str) -> Optional[str]:
+    """Url for api responses: absolute, relative ones resolved against the api base url."""
+    if not url:
+        return None
+    key = storage.key_from_url(url)
+    if key:
+        url = storage.url(key)
+    if url.startswith(("http://", "https://")):
+        return url
+    return f"{base_url.rstrip('/')}/{url.lstrip('/')}"
+
+
+def count_refs(urls: Iterable[Optional[str]], sign: int = 1) -> Counter:
+    """Reference deltas per key for the given image urls."""
+    deltas = Counter()
+    for url in urls:
+        key = storage.key_from_url(url)
+        if key:
+            deltas[key] += sign
+    return deltas
+
+
+async def adjust_refs(db: AsyncSession, deltas: Dict[str, int]) -> None:
+    """Applies reference deltas inside the caller's transaction."""
+    rows = [{"key": key, "refcount": delta} for key, delta in sorted(deltas.items()) if delta]
+    if not rows:
+        return
+    # atomic increment, sorted keys so concurrent writers lock in the same order
+    stmt = pg_insert(StoredImage).values(rows)
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=[StoredImage.key],
+        set_={"refcount": StoredImage.refcount + stmt.excluded.refcount, "updated_at": func.now()},
+    ))
+
+
+async def release_user_images(db: AsyncSession, user_id: int) -> None:
+    """Drops the references of all meals of a user (before the account is deleted)."""
+    result = await db.execute(
+        select(Meal.image_url, func.count())
+        .where(Meal.user_id == user_id, Meal.image_url.is_not(None))
+        .group_by(Meal.image_url)
+    )
+    deltas = Counter()
+    for url, count in result.all():
+        key = storage.key_from_url(url)
+        if key:
+            deltas[key] -= count
+    await adjust_refs(db, deltas)
+
+
+async def sweep_orphans(db: AsyncSession, grace_hours: Optional[int] = None) -> int:
+    """Deletes blobs nobody referenced for grace_hours. The caller commits."""
+    grace_hours = settings.STORAGE_ORPHAN_GRACE_HOURS if grace_hours is None else grace_hours
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=grace_hours)
+    result = await db.execute(
+        delete(StoredImage)
+        .where(StoredImage.refcount <= 0, StoredImage.updated_at < cutoff)
+        .returning(StoredImage.key)
+    )
+    keys = result.scalars().all()
+    # files go while the rows are still locked, a concurrent re-upload waits and stores again
+    for key in keys:
+        await storage.delete(key)
+        for size in set(settings.IMAGE_VARIANTS.values()):
+            await storage.delete(variant_key(key, size))
+    return len(keys)
+
+
+async def recount_refs(db: AsyncSession) -> None:
+    """Recomputes every refcount from the meals table. The caller commits."""
+    result = await db.execute(
+        select(Meal.image_url, func.count())
+        .where(Meal.image_url.is_not(None))
+        .group_by(Meal.image_url)
+    )
+    counts = Counter()
+    for url, count in result.all():
+        key = storage.key_from_url(url)
+        if key:
+            counts[key] += count
+
+    await db.execute(update(StoredImage).values(refcount=0))
+    await adjust_refs(db, counts)
+
+
+async def backfill_variants() -> int:
+    """Renders missing variants for every stored blob (after changing IMAGE_VARIANTS)."""
+    async with SessionLocal() as db:
+        result = await db.stream_scalars(select(StoredImage.key).execution_options(yield_per=1000))
+        count = 0
+        async for key in result:
+            await ensure_variants(key)
+            count += 1
+    return count
+
+
+async def _main(sweep: bool, recount: bool, variants: bool) -> None:
+    from app.db.session import engine
+
+    if variants:
+        print(f"✅ [STORAGE] Checked variants of {await backfill_variants()} images")
+    async with SessionLocal() as db:
+        if recount:
+            await recount_refs(db)
+            await db.commit()
+            print("✅ [STORAGE] Recounted image references")
+        if sweep:
+            removed = await sweep_orphans(db)
+            await db.commit()
+            print(f"🧹 [STORAGE] Removed {removed} unreferenced images")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintenance of the content-addressed image storage")
+    parser.add_argument("--sweep", action="store_true", help="delete unreferenced images")
+    parser.add_argument("--recount", action="store_true", help="recompute refcounts from meals")
+    parser.add_argument("--variants", action="store_true", help="render missing size variants")
+    args = parser.parse_args()
+    if not (args.sweep or args.recount or args.variants):
+        parser.error("nothing to do, pass --sweep, --recount and/or --variants")
+    asyncio.run(_main(args.sweep, args.recount, args.variants))
@@ -0,0 +1,92 @@
+# backend/app/services/sync_service.py
+# change tracking for delta sync.
+# every transaction that writes meals takes the next users.sync_version and stamps it
+# on the meals it creates/updates (meals.version) or on tombstones of deleted meals.
+# "what changed since X" is then an index range scan on (user_id, version).
+
+from typing import List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from fastapi import HTTPException
+from sqlalchemy import select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.timezones import get_zone
+from app.models.meal import Meal
+from app.models.meal_tombstone import MealTombstone
+from app.models.user import User
+from app.services.user_cache import invalidate_user
+
+
+async def bump_version(db: AsyncSession, user_id: int) -> Tuple[int, ZoneInfo]:
+    """
+    Next sync version for this transaction's changes, and the user's timezone.
+    The update also locks the user row, so concurrent writers of the same user commit
+    in version order, and the timezone can't change until this transaction ends.
+    Write paths bucket the rollup with this zone, never with the (cached) current_user's.
+    Raises 404 if the user is gone (deleted while still cached in another worker).
+    """
+    result = await db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(sync_version=User.sync_version + 1)
+        .returning(User.sync_version, User.timezone)
+        .execution_options(synchronize_session=False)
+    )
+    row = result.one_or_none()
+    if row is None:
+        await invalidate_user(user_id)
+        raise HTTPException(status_code=404, detail="User not found")
+    version, tz_name = row
+    return version, get_zone(tz_name)
+
+
+async def current_version(db: AsyncSession, user_id: int) -> int:
+    result = await db.execute(select(User.sync_version).where(User.id == user_id))
+    return result.scalar_one_or_none() or 0
+
+
+async def record_tombstones(db: AsyncSession, user_id: int, meal_ids: List[int], version: int) -> None:
+    if meal_ids:
+        await db.execute(
+            pg_insert(MealTombstone)
+            .values([{"user_id": user_id, "meal_id": meal_id, "version": version} for meal_id in meal_ids])
+            .on_conflict_do_nothing()
+        )
+
+
+async def get_changes(
+    db: AsyncSession,
+    user_id: int,
+    since: int,
+    after: Optional[Tuple[int, int]],
+    limit: int,
+    pinned_version: Optional[int] = None,
+) -> Tuple[int, List[Meal], List[int], bool]:
+    """
+    Returns (version, changed meals, deleted meal ids, has_more).
+    Meals are paged by (version, id) with `after`. Deletions are only sent with the first page,
+    so later pages pass the version of the first one (pinned_version) and return it unchanged:
+    whatever happens while paging has a higher version and comes with the next sync.
+    """
+    # read the version first: anything committed later has a higher one and shows up next time
+    version = pinned_version if pinned_version is not None else await current_version(db, user_id)
+
+    query = select(Meal).where(Meal.user_id == user_id, Meal.version > since)
+    if after:
+        query = query.where(tuple_(Meal.version, Meal.id) > tuple_(*after))
+    query = query.order_by(Meal.version, Meal.id).limit(limit + 1)
+    result = await db.execute(query)
+    meals = result.scalars().all()
+
+    deleted_ids: List[int] = []
+    if after is None:
+        result = await db.execute(
+            select(MealTombstone.meal_id)
+            .where(MealTombstone.user_id == user_id, MealTombstone.version > since)
+            .order_by(MealTombstone.version)
+        )
+        deleted_ids = list(result.scalars().all())
+
+    return version, meals[:limit], deleted_ids, len(meals) > limit
@@ -0,0 +1,104 @@
+# backend/app/services/upload_service.py
+# streaming uploads to disk without blocking the event loop
+# validates the real file type by magic bytes and hashes while writing,
+# then hands the file to the content-addressed storage (same photo -> same blob)
+
+import asyncio
+import hashlib
+from typing import NamedTuple, Optional
+
+from fastapi import UploadFile
+
+from app.core.config import settings
+from app.core.storage import storage
+from app.services.storage_service import ensure_variants, store_blob
+
+CHUNK_SIZE = 256 * 1024
+
+# brands of the iso media container used by heic/heif photos from iphones
+HEIF_BRANDS = {b"heic", b"heix", b"hevc", b"hevx", b"mif1", b"msf1", b"heim", b"heis"}
+
+
+class UploadRejected(Exception):
+    """Raised when an upload is too large or not a supported image."""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class StoredUpload(NamedTuple):
+    path: str           # path on disk
+    relative_url: str   # e.g. /static/media/ab/cd/<sha256>.jpg
+    key: str            # storage key
+    sha256: str         # hex digest of the content
+    size: int           # bytes
+    extension: str
+
+
+def detect_image_type(header: bytes) -> Optional[str]:
+    """Returns the file extension for known image signatures, else None."""
+    if header.startswith(b"\xff\xd8\xff"):
+        return "jpg"
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "webp"
+    if header[:6] in (b"GIF87a", b"GIF89a"):
+        return "gif"
+    if header[4:8] == b"ftyp" and header[8:12] in HEIF_BRANDS:
+        return "heic"
+    return None
+
+
+async def save_upload(file: UploadFile, max_bytes: Optional[int] = None) -> StoredUpload:
+    """
+    Streams an uploaded image to disk in chunks and stores it under its content hash.
+    File io runs in threads, the size limit is checked per chunk
+    and the sha256 is computed on the fly.
+    """
+    max_bytes = max_bytes or settings.UPLOAD_MAX_BYTES
+
+    first_chunk = await file.read(CHUNK_SIZE)
+    if not first_chunk:
+        raise UploadRejected(400, "empty file")
+
+    extension = detect_image_type(first_chunk[:32])
+    if extension is None:
+        raise UploadRejected(415, "unsupported image type")
+
+    # the name depends on the content, so write to a staging file first
+    tmp_path = storage.staging_path()
+
+    digest = hashlib.sha256()
+    size = 0
+    buffer = await asyncio.to_thread(open, tmp_path, "wb")
+    try:
+        chunk = first_chunk
+        while chunk:
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadRejected(413, f"file is larger than {max_bytes} bytes")
+            digest.update(chunk)
+            await asyncio.to_thread(buffer.write, chunk)
+            chunk = await file.read(CHUNK_SIZE)
+        await asyncio.to_thread(buffer.close)
+        key = await store_blob(tmp_path, digest.hexdigest(), extension, size)
+    except BaseException:
+        await asyncio.to_thread(buffer.close)
+        await storage.discard(tmp_path)
+        raise
+
+    # thumbnails for the history list, only rendered the first time a photo is seen
+    await ensure_variants(key)
+
+    return StoredUpload(
+        path=storage.local_path(key),
+        relative_url=storage.url(key),
+        key=key,
+        sha256=digest.hexdigest(),
+        size=size,
+        extension=extension,
+    )
+
@@ -0,0 +1,59 @@
+# backend/app/services/user_cache.py
+# short-lived cache of authenticated users, keyed by id.
+# saves the users lookup that every authenticated request used to make.
+# anything that writes a user must call invalidate_user() after the commit.
+
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.cache import create_cache
+from app.core.config import settings
+from app.models.user import User
+
+user_cache = create_cache(
+    "users",
+    settings.USER_CACHE_BACKEND,
+    settings.USER_CACHE_MAX_ENTRIES,
+    settings.USER_CACHE_TTL_SECONDS,
+)
+
+# password hashes never go to the cache (the sqlite backend is a plain file),
+# sync_version changes on every meal write - read it with sync_service.current_version
+_EXCLUDED = {"hashed_password", "sync_version"}
+
+
+def _serialize(user: User) -> dict:
+    data = {}
+    for column in User.__table__.columns:
+        if column.key in _EXCLUDED:
+            continue
+        value = getattr(user, column.key)
+        data[column.key] = value.isoformat() if isinstance(value, datetime) else value
+    return data
+
+
+def _deserialize(data: dict) -> User:
+    values = dict(data)
+    if values.get("created_at"):
+        values["created_at"] = datetime.fromisoformat(values["created_at"])
+    user = User(**values)
+    # looks like a freshly loaded row to the session: no pending changes,
+    # excluded columns are expired and loaded on demand (db.refresh)
+    make_transient_to_detached(user)
+    return user
+
+
+async def get_cached_user(user_id: int) -> Optional[User]:
+    """Detached User, attach it with db.add() before use."""
+    data = await user_cache.get(str(user_id))
+    return _deserialize(data) if data is not None else None
+
+
+async def cache_user(user: User) -> None:
+    await user_cache.set(str(user.id), _serialize(user))
+
+
+async def invalidate_user(user_id: int) -> None:
+    await user_cache.delete(str(user_id))
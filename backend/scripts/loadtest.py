@@ -0,0 +1,83 @@
+# backend/scripts/loadtest.py
+# tiny load generator for the whole request path.
+# start the api with AI_PROVIDER=fake so no real model is called, then e.g.:
+#   python scripts/loadtest.py --endpoint chat --requests 500 --concurrency 50
+#   python scripts/loadtest.py --endpoint analyze --image photo.jpg
+# (raise ANALYZE_RATE_LIMIT on the api first, it defaults to 5/minute per ip)
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+import httpx
+
+
+async def get_token(client: httpx.AsyncClient) -> str:
+    """Registers a throwaway user and logs in."""
+    email = f"load-{uuid.uuid4().hex[:8]}@example.com"
+    password = "load-test-password"
+    await client.post("/api/v1/users/", json={"email": email, "password": password})
+    response = await client.post(
+        "/api/v1/login/access-token", data={"username": email, "password": password}
+    )
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def run(args) -> None:
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=120) as client:
+        token = await get_token(client)
+        headers = {"Authorization": f"Bearer {token}"}
+        image = open(args.image, "rb").read() if args.image else None
+
+        semaphore = asyncio.Semaphore(args.concurrency)
+        latencies = []
+        statuses = {}
+
+        async def one(i: int) -> None:
+            async with semaphore:
+                started = time.perf_counter()
+                if args.endpoint == "chat":
+                    # unique questions unless --same, so caches don't hide the path cost
+                    message = "how much protein do I need" if args.same else f"question {i}"
+                    response = await client.post(
+                        "/api/v1/chat/", json={"message": message}, headers=headers
+                    )
+                elif args.endpoint == "analyze":
+                    response = await client.post(
+                        "/api/v1/meals/analyze",
+                        files={"file": ("meal.jpg", image, "image/jpeg")},
+                        headers=headers,
+                    )
+                else:
+                    response = await client.get("/api/v1/meals/summary", headers=headers)
+                latencies.append(time.perf_counter() - started)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(args.requests)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    print(f"requests:    {args.requests} in {elapsed:.2f}s ({args.requests / elapsed:.1f} req/s)")
+    print(f"statuses:    {statuses}")
+    print(f"latency p50: {statistics.median(latencies) * 1000:.1f} ms")
+    print(f"latency p95: {latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f} ms")
+    print(f"latency max: {latencies[-1] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the calorie tracker api")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--endpoint", choices=["chat", "analyze", "summary"], default="chat")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--image", help="photo to upload for --endpoint analyze")
+    parser.add_argument("--same", action="store_true", help="send the same chat question every time")
+    args = parser.parse_args()
+
+    if args.endpoint == "analyze" and not args.image:
+        parser.error("--image is required for --endpoint analyze")
+    asyncio.run(run(args))